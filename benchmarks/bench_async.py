@@ -0,0 +1,29 @@
+"""
+Wall-clock time of fetch_passages_async() at increasing concurrency, against a local stub server with injected latency.
+Run with: python benchmarks/bench_async.py [latency_seconds]
+"""
+import asyncio
+import sys
+import time
+
+sys.path.insert(0, 'src')
+
+from bibleparser.bibleparser import fetch_passages_async
+from bibleparser.client import PassageClient
+from bibleparser.testing import AsyncStubServer
+
+
+async def main(latency:float):
+    texts = [f'Psalm {n}' for n in range(1, 33)]
+    async with AsyncStubServer(latency=latency) as stub:
+        client = PassageClient(stub.url)
+        for concurrency in (1, 2, 4, 8, 16, 32):
+            start = time.perf_counter()
+            await fetch_passages_async(texts, concurrency=concurrency, backend=client)
+            elapsed = time.perf_counter() - start
+            print(f'concurrency={concurrency:<3} {len(texts)} passages in {elapsed*1000:7.1f} ms')
+        await client.aclose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.02))
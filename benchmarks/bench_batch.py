@@ -0,0 +1,56 @@
+"""
+Throughput benchmark for parse_references() at 1, 2, 4 and 8 workers, compared with a plain parse_reference() loop.
+Run with: python benchmarks/bench_batch.py [count]
+"""
+import random
+import sys
+import time
+
+sys.path.insert(0, 'src')
+
+from bibleparser.batch import parse_references
+from bibleparser.bibleparser import parse_reference
+
+
+SAMPLES = [
+    "John 3:16", "psalm twenty three", "Romans 8:28", "matthew twenty one twelve", "1st John 11",
+    "Michael 11", "June one one", "Hey guy 223", "X123", "first join 3 16", "habit cook 2 4",
+    "song of Solomon four five", "second kings 2020 through 21", "Revelations 1 1", "?!",
+]
+
+
+def corpus(count:int, seed:int=0) -> list:
+    # Skewed like real traffic: a few popular references plus a long tail of numbered variants.
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            texts.append(rng.choice(SAMPLES[:3]))
+        else:
+            texts.append(f'{rng.choice(SAMPLES)} {rng.randint(1, 30)}')
+    return texts
+
+
+def loop(texts):
+    for text in texts:
+        try:
+            yield parse_reference(text)
+        except Exception as e:
+            yield e
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    texts = corpus(count)
+
+    runs = [('loop', lambda: loop(texts))]
+    runs += [(f'workers={w}', lambda w=w: parse_references(texts, workers=w, chunksize=2048)) for w in (1, 2, 4, 8)]
+    for name, run in runs:
+        start = time.perf_counter()
+        n = sum(1 for _ in run())
+        seconds = time.perf_counter() - start
+        print(f'{name:>10}: {n/seconds:10.0f} refs/sec')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Latency of PassageClient.fetch() against a local stub server, with and without connection reuse.
+Run with: python benchmarks/bench_client.py [requests]
+"""
+import statistics
+import sys
+import time
+
+sys.path.insert(0, 'src')
+
+from bibleparser.client import PassageClient
+from bibleparser.testing import StubServer
+
+
+def measure(client, count:int) -> list:
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        client.fetch("John 3:16")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with StubServer() as stub:
+        for name, max_connections in (('new connection', 0), ('keep-alive', 10)):
+            with PassageClient(stub.url, max_connections=max_connections) as client:
+                timings = sorted(measure(client, count))
+            p50 = statistics.median(timings) * 1e6
+            p99 = timings[int(len(timings) * 0.99)] * 1e6
+            print(f'{name:>15}: p50 {p50:7.0f} us  p99 {p99:7.0f} us')
+        print(f'{"connections":>15}: {stub.connections}')
+
+
+if __name__ == '__main__':
+    main()
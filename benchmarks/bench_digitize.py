@@ -0,0 +1,82 @@
+"""
+Micro-benchmark for digitize().
+Compares the precompiled single-pass normalizer against the previous implementation, which rebuilt its tables and patterns on every call.
+Run with: python benchmarks/bench_digitize.py
+"""
+import re
+import sys
+import timeit
+
+sys.path.insert(0, 'src')
+
+from bibleparser.bibleparser import digitize
+
+
+def digitize_legacy(text:str) -> str:
+    ones = {
+        'one':'1', 'won':'1', 'went':'1',
+        'two':'2',
+        'three':'3',
+        'four':'4', 'for':'4',
+        'five':'5',
+        'six':'6', 'sicks':'6',
+        'seven':'7',
+        'eight':'8', 'ate':'8',
+        'nine':'9',
+    }
+    tens = {
+        'twenty':'20',
+        'thirty':'30',
+        'forty':'40', 'fourty':'40',
+        'fifty':'50',
+        'sixty':'60',
+        'seventy':'70',
+        'eighty':'80',
+        'ninety':'90',
+    }
+
+    def digitize_composite(m):
+        parts = m.group(0).lower().split('-')
+        return str(int(tens[parts[0]]) + int(ones[parts[1]]))
+    pattern = r'\b(' + '|'.join(re.escape(key) for key in tens.keys()) + r')-(' + '|'.join(re.escape(key) for key in ones.keys()) + r')\b'
+    text = re.sub(pattern, digitize_composite, text, flags=re.IGNORECASE)
+
+    word2num = {
+        **ones,
+        **tens,
+        **{
+        'ten':'10', 'eleven':'11', 'twelve':'12', 'thirteen':'13', 'fourteen':'14',
+        'fifteen':'15', 'sixteen':'16', 'seventeen':'17', 'eighteen':'18', 'nineteen':'19',
+    }}
+    pattern = r'\b(' + '|'.join(re.escape(key) for key in word2num.keys()) + r')\b'
+    text = re.sub(pattern, lambda m: word2num[m.group(0).lower()], text, flags=re.IGNORECASE)
+
+    return text
+
+
+CORPUS = [
+    "John 3:16",
+    "john three sixteen",
+    "won timothy for ate",
+    "psalm forty-two",
+    "psalm ninety-nine nine",
+    "matthew twenty one twelve",
+    "second kings twenty twenty through twenty-one",
+    "song of Solomon four five",
+    "Hey guy 223",
+]
+
+
+def main():
+    for text in CORPUS:
+        assert digitize(text) == digitize_legacy(text), text
+
+    number = 20000
+    for name, fn in (('legacy', digitize_legacy), ('precompiled', digitize)):
+        seconds = timeit.timeit(lambda: [fn(t) for t in CORPUS], number=number)
+        per_call = seconds / (number * len(CORPUS)) * 1e6
+        print(f'{name:>12}: {per_call:6.2f} us/call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Throughput of iter_references() over a synthetic sermon transcript, from a string and from a file read in chunks.
+Run with: python benchmarks/bench_extract.py [megabytes]
+"""
+import io
+import random
+import sys
+import time
+
+sys.path.insert(0, 'src')
+
+from bibleparser.extract import iter_references
+
+
+PROSE = (
+    "and so we come back again to the question of what it means to be faithful in the small things of everyday life "
+    "when nobody is watching and there is no reward for doing what is right, which is where the second point comes in "
+)
+REFERENCES = [
+    "John 3:16", "Romans 8:28", "psalm twenty three", "first Corinthians 13:4-7", "Genesis 1 1", "Matthew 2112",
+    "Song of Solomon 2:4", "Hebrews 11", "Mark my words", "1 Peter 5:7", "revelations 22 verse 21", "Jude 3",
+]
+
+
+def corpus(size:int) -> str:
+    rng = random.Random(0)
+    pieces = []
+    length = 0
+    while length < size:
+        piece = PROSE[:rng.randrange(40, len(PROSE))] + rng.choice(REFERENCES) + '. '
+        pieces.append(piece)
+        length += len(piece)
+    return ''.join(pieces)
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    text = corpus(int(megabytes * 1e6))
+    size = len(text.encode('utf-8')) / 1e6
+
+    for name, source in (('string', lambda: text), ('file', lambda: io.StringIO(text))):
+        best = float('inf')
+        for _ in range(3):
+            s = source()
+            start = time.perf_counter()
+            count = sum(1 for _ in iter_references(s))
+            best = min(best, time.perf_counter() - start)
+        print(f'{name:>8}: {size / best:6.1f} MB/s ({count} references in {size:.1f} MB)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Micro-benchmark for the fuzzy book-name lookup used by format_book().
+Compares FuzzyIndex.best_match against difflib.get_close_matches over the book keys.
+Run with: python benchmarks/bench_fuzzy.py
+"""
+import sys
+import timeit
+from difflib import get_close_matches
+
+sys.path.insert(0, 'src')
+
+from bibleparser.book_chapter_verses import book_chapter_verses
+from bibleparser.fuzzy import FuzzyIndex
+
+
+WORDS = ['michael', 'join', 'gen', '1 tessa', 'hag i', 'habit cook', 'levitic us', 'dude', 'first corinth', 'zzzz']
+
+
+def main():
+    keys = list(book_chapter_verses.keys())
+    index = FuzzyIndex(keys)
+
+    def difflib_lookup(word):
+        matches = get_close_matches(word, keys, n=1, cutoff=0.6)
+        return matches[0] if matches else None
+
+    for word in WORDS:
+        assert index.best_match(word) == difflib_lookup(word), word
+
+    number = 500
+    for name, fn in (('difflib', difflib_lookup), ('FuzzyIndex', index.best_match)):
+        seconds = timeit.timeit(lambda: [fn(w) for w in WORDS], number=number)
+        per_call = seconds / (number * len(WORDS)) * 1e6
+        print(f'{name:>12}: {per_call:8.2f} us/call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Cold-start cost: importing bibleparser and running the first parse, with and without the prebuilt artifact.
+Each measurement is the best of several fresh interpreters with a warm bytecode cache.
+Run with: python benchmarks/bench_import.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, 'src')
+
+from bibleparser import artifact
+
+
+CASES = [
+    ('import (parse only)', 'import bibleparser.bibleparser'),
+    ('import + first parse', 'from bibleparser.bibleparser import parse_reference; parse_reference("Michael 1 1")'),
+    ('import passage API', 'from bibleparser.bibleparser import fetch_passage; fetch_passage.__name__'),
+]
+
+
+def measure(code:str, env:dict, runs:int=5) -> float:
+    timer = f'import time; _start = time.perf_counter()\n{code}\nprint(time.perf_counter() - _start)'
+    subprocess.run([sys.executable, '-c', timer], env=env, check=True, capture_output=True)
+    return min(float(subprocess.run([sys.executable, '-c', timer], env=env, check=True, capture_output=True, text=True).stdout) for _ in range(runs))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tables.marshal')
+        artifact.build(path)
+        base = {**os.environ, 'PYTHONPATH': 'src', 'PYTHONDONTWRITEBYTECODE': '', 'PYTHONPYCACHEPREFIX': os.path.join(tmp, 'pycache')}
+        for name, code in CASES:
+            without = measure(code, {**base, 'BIBLEPARSER_ARTIFACT': os.path.join(tmp, 'missing')})
+            with_artifact = measure(code, {**base, 'BIBLEPARSER_ARTIFACT': path})
+            print(f'{name:>22}: {without*1000:6.2f} ms  (with artifact: {with_artifact*1000:6.2f} ms)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+The cost of instrumentation: parse_reference() with no hooks, with a hook that does nothing, and with a MetricsAggregator.
+Run with: python benchmarks/bench_instrument.py [count]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import corpus
+
+from bibleparser.bibleparser import parse_reference
+from bibleparser.instrument import MetricsAggregator, add_hook, remove_hook
+
+
+def parse_all(texts:list):
+    for text in texts:
+        try:
+            parse_reference(text)
+        except ValueError:
+            pass
+
+
+def timed(name:str, texts:list, hook=None, rounds:int=5):
+    if hook is not None:
+        add_hook(hook)
+    try:
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            parse_all(texts)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if hook is not None:
+            remove_hook(hook)
+    print(f'{name:>18}: {best*1000:8.1f} ms ({best / len(texts) * 1e6:.2f} us/parse)')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    texts = [text for _, text in corpus(count)]
+    parse_all(texts)
+
+    timed('no hooks', texts)
+    timed('no-op hook', texts, lambda stage, seconds, tags: None)
+    timed('MetricsAggregator', texts, MetricsAggregator())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Latency of fetching passages from a packed LocalBible file compared with PassageClient against a local stub server.
+Run with: python benchmarks/bench_local.py
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, 'src')
+
+from bibleparser.book_chapter_verses import book_chapter_verses
+from bibleparser.client import PassageClient
+from bibleparser.local import LocalBible, build
+from bibleparser.testing import StubServer
+
+
+PASSAGES = ["John 3:16", "John 3:16-18", "Psalms 23", "Romans 8:28", "Psalms 119", "Jude"]
+
+
+def records():
+    for book, chapters in book_chapter_verses.items():
+        for chapter, verses in chapters.items():
+            for verse in range(1, verses+1):
+                yield (book, chapter, verse, f'Text of {book} {chapter}:{verse}, with some padding to approximate a real verse.')
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.bible')
+        print(f'{"build":>12}: {timeit.timeit(lambda: build(records(), path), number=1)*1000:8.1f} ms ({os.path.getsize(path)} bytes)')
+
+        number = 2000
+        with LocalBible(path) as bible, StubServer() as stub, PassageClient(stub.url) as client:
+            for name, backend in (('local', bible), ('http stub', client)):
+                seconds = timeit.timeit(lambda: [backend.fetch(p) for p in PASSAGES], number=number)
+                print(f'{name:>12}: {seconds / (number * len(PASSAGES)) * 1e6:8.1f} us/passage')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Sorting and deduplicating passages as Reference objects, compared with re-parsing canonical reference strings to do the same.
+Run with: python benchmarks/bench_reference.py [count]
+"""
+import random
+import sys
+import time
+
+sys.path.insert(0, 'src')
+
+from bibleparser.bibleparser import parse_parts
+from bibleparser.reference import Reference, merge_references
+from bibleparser.verse_table import TOTAL_VERSES, verse_location
+
+
+def references(count:int) -> list:
+    rng = random.Random(0)
+    result = []
+    while len(result) < count:
+        start = rng.randrange(TOTAL_VERSES)
+        end = min(start + rng.randrange(5), TOTAL_VERSES - 1)
+        if verse_location(start)[:2] == verse_location(end)[:2]:
+            result.append(Reference.from_ordinals(start, end))
+    return result
+
+
+def timed(name:str, fn, count:int):
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    print(f'{name:>22}: {seconds*1000:8.1f} ms ({seconds / count * 1e6:.2f} us/reference)')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    refs = references(count)
+    strings = [str(r) for r in refs]
+
+    timed('sort Reference', lambda: sorted(refs), count)
+    timed('sort Reference by key', lambda: sorted(refs, key=Reference.sort_key), count)
+    timed('dedupe Reference', lambda: set(refs), count)
+    timed('merge Reference', lambda: merge_references(refs), count)
+
+    # What downstream services did before: recover the order from the strings.
+    count = min(count, 100000)
+    timed('sort strings (parsed)', lambda: sorted(strings[:count], key=lambda s: Reference.from_parts(parse_parts(s)).ordinals), count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Memory and lookup benchmark for the array-backed verse table against the nested book_chapter_verses dicts.
+Run with: python benchmarks/bench_verse_table.py
+"""
+import sys
+import timeit
+
+sys.path.insert(0, 'src')
+
+from bibleparser import verse_table
+from bibleparser.book_chapter_verses import book_chapter_verses
+
+
+def dict_size(d) -> int:
+    size = sys.getsizeof(d)
+    for book, chapters in d.items():
+        size += sys.getsizeof(book) + sys.getsizeof(chapters)
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k,v in chapters.items())
+    return size
+
+def table_size() -> int:
+    size = sum(sys.getsizeof(a) for a in (verse_table._BOOK_CHAPTERS, verse_table._CHAPTER_VERSES, verse_table._CHAPTER_ORDINALS))
+    size += sys.getsizeof(verse_table.BOOKS) + sum(sys.getsizeof(b) for b in verse_table.BOOKS)
+    return size + sys.getsizeof(verse_table.BOOK_ORDINALS)
+
+
+def main():
+    print(f'{"nested dicts":>14}: {dict_size(book_chapter_verses):7d} bytes')
+    print(f'{"arrays":>14}: {table_size():7d} bytes')
+    print()
+
+    books = list(book_chapter_verses)
+    number = 2000
+    lookups = [
+        ('max chapter (dict)', lambda: [max(book_chapter_verses[b].keys()) for b in books]),
+        ('max chapter (array)', lambda: [verse_table.max_chapter(b) for b in books]),
+        ('verse count (dict)', lambda: [book_chapter_verses[b][1] for b in books]),
+        ('verse count (array)', lambda: [verse_table.verse_count(b, 1) for b in books]),
+    ]
+    for name, fn in lookups:
+        seconds = timeit.timeit(fn, number=number)
+        print(f'{name:>20}: {seconds / (number * len(books)) * 1e9:7.0f} ns/lookup')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+A synthetic corpus of dictated references, for benchmarks: clean references, number words, speech-recognition mistakes and garbage.
+Deterministic for a given seed, so runs are comparable.
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from bibleparser.verse_table import BOOKS, max_chapter, verse_count
+
+
+# The share of each kind of input, roughly as seen from the Siri shortcut.
+MIX = (('clean', 0.4), ('words', 0.25), ('siri', 0.25), ('garbage', 0.1))
+
+# Mistranscriptions seen in practice, with the real book's chapter and verse following.
+SIRI_BOOKS = [
+    "Hey guy", "hag eye", "X", "ax", "June", "roof", "marc", "jon", "first jon", "habit cook", "tight us",
+    "Phillipians", "Revelations", "song of songs", "psalm", "proverb", "name", "a moss", "Michael", "Jeremy", "first join",
+]
+GARBAGE = [
+    "?!", "hello", "what time is it", "12 34", "the the", "chapter verse", "um", "call mom", "3:16", "set a timer for 10 minutes",
+]
+
+_ONES = ['', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
+_TEENS = ['ten', 'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen', 'eighteen', 'nineteen']
+_TENS = ['', '', 'twenty', 'thirty', 'forty', 'fifty', 'sixty', 'seventy', 'eighty', 'ninety']
+_ORDINALS = {'1': 'first', '2': 'second', '3': 'third'}
+
+
+def words(n:int) -> str:
+    """
+    Spell out a number as it might be dictated. The parser only knows words up to ninety-nine, so larger numbers stay digits.
+    """
+    if n >= 100:
+        return str(n)
+    if n < 10:
+        return _ONES[n]
+    if n < 20:
+        return _TEENS[n - 10]
+    return _TENS[n // 10] + ('-' + _ONES[n % 10] if n % 10 else '')
+
+
+def corpus(count:int=2000, seed:int=0) -> list:
+    """
+    Return count (kind, text) pairs.
+    """
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    return [(kind, _make(kind, rng)) for kind in rng.choices(kinds, weights, k=count)]
+
+
+def _make(kind:str, rng) -> str:
+    if kind == 'garbage':
+        return rng.choice(GARBAGE)
+
+    book = rng.choice(BOOKS)
+    chapter = rng.randint(1, max_chapter(book))
+    verse = rng.randint(1, verse_count(book, chapter))
+    if kind == 'siri':
+        name = rng.choice(SIRI_BOOKS)
+        # Run chapter and verse together ("Matthew 2112") or leave them apart.
+        return f'{name} {chapter}{verse}' if rng.random() < 0.4 else f'{name} {chapter} {verse}'
+
+    number, _, rest = book.partition(' ')
+    if kind == 'words':
+        if rest and number in _ORDINALS:
+            book = f'{_ORDINALS[number]} {rest}'
+        return f'{book} {words(chapter)} {words(verse)}'
+
+    form = rng.random()
+    book = book.title()
+    if form < 0.5:
+        return f'{book} {chapter}:{verse}'
+    if form < 0.75:
+        end = min(verse + rng.randint(1, 5), verse_count(book.lower(), chapter))
+        return f'{book} {chapter}:{verse}-{end}'
+    if form < 0.9:
+        return f'{book} {chapter}'
+    return f'{book} chapter {chapter} verse {verse}'
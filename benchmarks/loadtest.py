@@ -0,0 +1,112 @@
+"""
+Load test for the parse server: keep-alive connections send requests from corpus.py's synthetic corpus as fast as the server answers.
+Reports requests/sec, p50/p99 latency and the responses' statuses.
+
+Unless --url or --unix points at a running server, starts `python -m bibleparser serve` on a free port (passing any arguments
+after --), with a local stub as the passage upstream.
+
+Run with: python benchmarks/loadtest.py [--endpoint parse|passage|batch] [--connections 32] [--duration 5] [--url URL | --unix PATH] [-- serve options]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from urllib.parse import quote, urlsplit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import corpus
+
+from bibleparser._asynchttp import read_response
+from bibleparser.testing import StubServer
+
+
+def request(endpoint:str, texts:list, i:int) -> bytes:
+    if endpoint == 'batch':
+        body = json.dumps({'references': [texts[(i + j) % len(texts)] for j in range(16)]}).encode('utf-8')
+        head = f'POST /parse HTTP/1.1\r\nHost: loadtest\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n'
+        return head.encode('latin-1') + body
+    return f'GET /{endpoint}?q={quote(texts[i % len(texts)])} HTTP/1.1\r\nHost: loadtest\r\n\r\n'.encode('latin-1')
+
+
+async def worker(connect, endpoint:str, texts:list, offset:int, deadline:float, latencies:list, statuses:Counter):
+    reader, writer = await connect()
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request(endpoint, texts, i))
+            status, _, _, _ = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+            i += 1
+    finally:
+        writer.close()
+
+
+async def load(connect, endpoint:str, texts:list, connections:int, duration:float) -> tuple:
+    latencies, statuses = [], Counter()
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(connect, endpoint, texts, n * 97, deadline, latencies, statuses) for n in range(connections)))
+    return (time.perf_counter() - start, sorted(latencies), statuses)
+
+
+def start_server(serve_args:list, upstream:str) -> tuple:
+    env = {**os.environ, 'PYTHONPATH': os.path.join(ROOT, 'src')}
+    args = [sys.executable, '-m', 'bibleparser', 'serve', '--port', '0', '--upstream', upstream] + serve_args
+    process = subprocess.Popen(args, env=env, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith('Listening on '):
+        process.kill()
+        raise RuntimeError(f'Server failed to start: {line!r}')
+    return (process, line[len('Listening on '):].strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python benchmarks/loadtest.py', description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--endpoint', choices=['parse', 'passage', 'batch'], default='parse', help='what to request (batch: POST /parse with 16 references)')
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds')
+    parser.add_argument('--url', help='a running server, eg. http://127.0.0.1:8080')
+    parser.add_argument('--unix', metavar='PATH', help='a running server on a Unix socket')
+    parser.add_argument('serve_args', nargs='*', help='options for the server this script starts, after --')
+    args = parser.parse_args()
+
+    texts = [text for kind, text in corpus(2000) if kind != 'garbage' or args.endpoint != 'passage']
+    process = stub = None
+    url = args.url
+    if not url and not args.unix:
+        stub = StubServer().start()
+        process, url = start_server(args.serve_args, stub.url)
+
+    if args.unix:
+        connect = lambda: asyncio.open_unix_connection(args.unix)
+    else:
+        address = urlsplit(url)
+        connect = lambda: asyncio.open_connection(address.hostname, address.port)
+
+    try:
+        elapsed, latencies, statuses = asyncio.run(load(connect, args.endpoint, texts, args.connections, args.duration))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if stub is not None:
+            stub.stop()
+
+    count = len(latencies)
+    print(f'{count} requests over {args.connections} connections in {elapsed:.2f}s: {count / elapsed:,.0f} requests/sec')
+    if count:
+        print(f'latency p50 {latencies[count // 2] * 1000:.2f} ms, p99 {latencies[min(count - 1, int(count * 0.99))] * 1000:.2f} ms')
+    print('statuses: ' + ', '.join(f'{status}: {n}' for status, n in sorted(statuses.items())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""
+Benchmark harness for the parse and fetch hot paths, with JSON baselines for catching regressions.
+
+Reports ops/sec and p50/p99 latency for parse_reference() as a whole, for each of its stages (digitize, filter, format_book, range_check),
+and for fetch_passage() against a local stub server. The inputs come from corpus.py's synthetic dictation corpus.
+
+Run with: python benchmarks/run.py [--save baseline.json] [--compare baseline.json] [--threshold 0.2] [--stage-threshold STAGE=FRACTION]
+With --compare, exits with status 1 if any stage's ops/sec fell by more than its threshold (a fraction), or with --check-latency,
+if its p50 latency rose by more. p99 latency is only reported. Baselines are only comparable on the same machine. An interleaved
+calibration stage corrects for the machine running faster or slower than when the baseline was saved, but a shared machine
+may still need a looser threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+# Found from this file, so the harness runs from any directory and imports as benchmarks.run.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import corpus
+
+import bibleparser.bibleparser as bp
+from bibleparser.client import PassageClient
+from bibleparser.testing import StubServer
+
+
+# Metrics compare() can check, and whether a larger value is better. p50 latency is only checked on request (see --check-latency),
+# as it's measured less robustly than ops/sec and sub-microsecond stages are dominated by noise.
+METRICS = {'ops_per_sec': True, 'p50_us': False}
+
+# Stages that need a looser threshold than --threshold. Round trips to the stub server vary much more than parsing does.
+STAGE_THRESHOLDS = {'fetch_passage': 0.4}
+
+# The stages of parse_parts(), named as bibleparser.instrument reports them, and the functions in bibleparser.bibleparser doing each.
+STAGES = {'digitize': 'digitize', 'filter': '_split_words', 'format_book': 'format_book', 'range_check': 'range_check'}
+
+
+def measure(stages:dict, rounds:int=7, min_round:float=0.05) -> dict:
+    """
+    Time each stage's fn over its inputs, given as {name: (fn, inputs, min_round)}. Exceptions raised by fn count as completed calls
+    (garbage input is part of the corpus). Returns {name: {'ops_per_sec', 'p50_us', 'p99_us'}}.
+    ops/sec is from the fastest of rounds, each repeating the inputs enough to take at least min_round seconds (like timeit's autorange).
+    Rounds of different stages are interleaved, so a slow spell on a shared machine doesn't land on one stage.
+    Percentiles are of the time per call for each input.
+    """
+    def timer(fn, inputs):
+        def once(repeat:int=1) -> float:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for x in inputs:
+                    try:
+                        fn(x)
+                    except Exception:
+                        pass
+            return (time.perf_counter() - start) / repeat
+        return once
+
+    timers = {name: timer(fn, inputs) for name, (fn, inputs, _) in stages.items()}
+    first = {name: max(once(), 1e-9) for name, once in timers.items()}
+    repeats = {name: max(1, round(stages[name][2] / first[name])) for name in stages}
+    best = dict(first)
+    for _ in range(rounds):
+        for name, once in timers.items():
+            best[name] = min(best[name], once(repeats[name]))
+
+    results = {}
+    for name, (fn, inputs, _) in stages.items():
+        # A single call of a microsecond-scale stage is mostly timer noise, so each input is timed over enough calls to take ~20us.
+        # Each input's best of a few passes, for the same reason ops/sec uses the fastest round.
+        per_input = max(1, round(20e-6 / (first[name] / len(inputs))))
+        passes = [timer(fn, [x]) for x in inputs]
+        timings = sorted(min(once(per_input) for _ in range(min(rounds, 3))) for once in passes)
+        results[name] = {
+            'ops_per_sec': round(len(inputs) / best[name], 1),
+            'p50_us': round(timings[len(timings) // 2] * 1e6, 3),
+            'p99_us': round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1e6, 3),
+        }
+    return results
+
+
+def stage_inputs(texts:list) -> dict:
+    """
+    Return the arguments each stage of parse_parts() is called with for texts, recorded from a real run.
+    """
+    recorded = {stage: [] for stage in STAGES}
+    originals = {stage: getattr(bp, name) for stage, name in STAGES.items()}
+
+    def recorder(stage):
+        def record(arg):
+            recorded[stage].append(arg)
+            return originals[stage](arg)
+        return record
+
+    for stage, name in STAGES.items():
+        setattr(bp, name, recorder(stage))
+    try:
+        for text in texts:
+            try:
+                bp.parse_parts(text)
+            except ValueError:
+                pass
+    finally:
+        for stage, fn in originals.items():
+            setattr(bp, STAGES[stage], fn)
+    return recorded
+
+
+def run(count:int=2000, fetches:int=500, rounds:int=7, seed:int=0) -> dict:
+    texts = [text for _, text in corpus(count, seed)]
+    # Build the lazily-loaded tables first, so they aren't counted against the first stage to need them.
+    for text in texts:
+        try:
+            bp.parse_reference(text)
+        except ValueError:
+            pass
+
+    stages = {'calibration': (_calibration, texts, 0.05), 'parse_reference': (bp.parse_reference, texts, 0.05)}
+    for stage, inputs in stage_inputs(texts).items():
+        stages[stage] = (getattr(bp, STAGES[stage]), inputs, 0.05)
+    results = measure(stages, rounds)
+
+    fetched = [text for kind, text in corpus(fetches, seed + 1) if kind != 'garbage']
+    with StubServer() as stub, PassageClient(stub.url) as client:
+        results.update(measure({'fetch_passage': (lambda text: bp.fetch_passage(text, client), fetched, 0)}, rounds=3))
+    return results
+
+
+def _calibration(text:str):
+    # A fixed pure-Python workload (string handling and dict lookups, like parsing) that doesn't touch bibleparser.
+    # Its speed tracks how fast the machine is running at the moment.
+    words = text.lower().replace(':', ' ').split()
+    return {w: len(w) for w in words}.get('john', ' '.join(sorted(words)))
+
+
+def compare(baseline:dict, results:dict, threshold:float, stage_thresholds:dict=None, metrics:tuple=('ops_per_sec',)) -> list:
+    """
+    Return a description of each of metrics that regressed by more than threshold (a fraction) from baseline.
+    stage_thresholds overrides threshold for particular stages. Stages missing from either side are skipped.
+    If both have a calibration stage that ran slower this time, the baseline is first scaled down to match, so a machine that's busier
+    (or throttled) than when the baseline was saved doesn't look like a regression. It's never scaled up, as not every stage speeds up
+    along with the calibration.
+    """
+    speed = 1.0
+    if baseline.get('calibration', {}).get('ops_per_sec') and 'calibration' in results:
+        speed = min(1.0, results['calibration']['ops_per_sec'] / baseline['calibration']['ops_per_sec'])
+
+    regressions = []
+    for stage, measured in results.items():
+        base = baseline.get(stage)
+        if base is None or stage == 'calibration':
+            continue
+        limit = (stage_thresholds or {}).get(stage, threshold)
+        for metric in metrics:
+            higher_is_better = METRICS[metric]
+            old, new = base.get(metric), measured.get(metric)
+            if not old or new is None:
+                continue
+            old = old * speed if higher_is_better else old / speed
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > limit:
+                regressions.append(f'{stage} {metric}: {old:g} -> {new:g} ({change:+.1%})')
+    return regressions
+
+
+def report(results:dict, baseline:dict=None):
+    print(f'{"stage":>16} {"ops/sec":>12} {"p50 us":>10} {"p99 us":>10}')
+    for stage, m in results.items():
+        line = f'{stage:>16} {m["ops_per_sec"]:12,.0f} {m["p50_us"]:10.2f} {m["p99_us"]:10.2f}'
+        base = (baseline or {}).get(stage)
+        if base and base.get('ops_per_sec'):
+            line += f'   ({m["ops_per_sec"] / base["ops_per_sec"] - 1:+.1%} ops/sec)'
+        print(line)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python benchmarks/run.py', description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--save', metavar='PATH', help='write the results to a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare the results with a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='largest tolerated regression, as a fraction (default 0.2)')
+    parser.add_argument('--stage-threshold', metavar='STAGE=FRACTION', action='append', default=[], help=f'threshold for one stage (defaults: {STAGE_THRESHOLDS})')
+    parser.add_argument('--check-latency', action='store_true', help='also fail on p50 latency regressions')
+    parser.add_argument('--count', type=int, default=2000, help='corpus size for the parse stages')
+    parser.add_argument('--fetches', type=int, default=500, help='corpus size for fetch_passage')
+    parser.add_argument('--rounds', type=int, default=7, help='rounds per parse stage; the fastest counts')
+    args = parser.parse_args(argv)
+
+    stage_thresholds = dict(STAGE_THRESHOLDS)
+    for option in args.stage_threshold:
+        stage, sep, fraction = option.partition('=')
+        try:
+            stage_thresholds[stage] = float(fraction)
+        except ValueError:
+            sep = ''
+        if not sep:
+            parser.error(f'--stage-threshold must look like STAGE=FRACTION: {option!r}')
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    results = run(args.count, args.fetches, args.rounds)
+    report(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'results': results}, f, indent=2)
+            f.write('\n')
+
+    if baseline is not None:
+        metrics = ('ops_per_sec', 'p50_us') if args.check_latency else ('ops_per_sec',)
+        regressions = compare(baseline, results, args.threshold, stage_thresholds, metrics)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Command-line entry point.
+
+    python -m bibleparser serve [--host HOST] [--port PORT | --unix PATH] [--workers N] ...
+"""
+import argparse
+import asyncio
+import sys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bibleparser')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    serve = commands.add_parser('serve', help='run the parse server (see bibleparser.server)', description='Run a long-running parse and passage server.')
+    serve.add_argument('--host', default='127.0.0.1', help='address to listen on (default 127.0.0.1)')
+    serve.add_argument('--port', type=int, default=8080, help='port to listen on (default 8080; 0 picks a free one)')
+    serve.add_argument('--unix', metavar='PATH', help='listen on a Unix socket at PATH instead of TCP')
+    serve.add_argument('--workers', type=int, default=0, help='parse batches in this many worker processes (default 0: on the event loop)')
+    serve.add_argument('--batch-window', type=float, default=0.0, metavar='MS', help='how long to collect parse requests into a batch, in milliseconds (default 0: those arriving together)')
+    serve.add_argument('--max-batch', type=int, default=256, help='parse a batch as soon as this many requests are waiting (default 256)')
+    serve.add_argument('--cache-size', type=int, default=4096, help='parse cache entries (default 4096; 0 disables)')
+    serve.add_argument('--upstream', metavar='URL', help='passage API base URL (default bible-api)')
+    serve.add_argument('--local', metavar='PATH', help='serve passages from a packed Bible file (see bibleparser.local) instead of the API')
+    serve.add_argument('--passage-cache', type=int, default=1024, metavar='SIZE', help='passages to keep in memory (default 1024; 0 disables)')
+    serve.add_argument('--passage-db', metavar='PATH', help='also cache passages in a sqlite database at PATH')
+    serve.add_argument('--metrics', action='store_true', help='record per-stage timings and serve them at /metrics (with --workers, only the passage stages)')
+    serve.add_argument('--max-body', type=int, default=None, metavar='BYTES', help='reject request bodies larger than this with 413 (default 256 KiB)')
+    serve.add_argument('--grace', type=float, default=10.0, help='seconds to let requests in progress finish on shutdown (default 10)')
+    args = parser.parse_args(argv)
+
+    if args.workers < 0:
+        parser.error('--workers must be at least 0')
+    if args.max_batch < 1:
+        parser.error('--max-batch must be at least 1')
+    return _serve(args)
+
+
+def _serve(args) -> int:
+    from . import server
+    from .client import PassageClient
+    from .passage_cache import CachedBackend, PassageCache
+
+    server.warm(args.cache_size)
+
+    if args.local:
+        from .local import LocalBible
+        backend = LocalBible(args.local)
+    else:
+        backend = PassageClient(args.upstream) if args.upstream else PassageClient()
+    if args.passage_cache or args.passage_db:
+        backend = CachedBackend(backend, PassageCache(args.passage_db, maxsize=max(args.passage_cache, 1)))
+
+    metrics = None
+    if args.metrics:
+        from .instrument import MetricsAggregator, add_hook
+        metrics = add_hook(MetricsAggregator())
+
+    executor = None
+    if args.workers:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(args.workers, initializer=server.warm, initargs=(args.cache_size,))
+
+    batcher = server.ParseBatcher(args.batch_window / 1000, args.max_batch, executor)
+    parse_server = server.ParseServer(args.host, args.port, args.unix, backend, batcher, metrics, args.grace, args.max_body or server.MAX_BODY)
+
+    async def run():
+        await parse_server.start()
+        print(f'Listening on {parse_server.address}', flush=True)
+        try:
+            await server.serve(parse_server)
+        finally:
+            await _close(backend)
+
+    try:
+        asyncio.run(run())
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return 0
+
+
+async def _close(backend):
+    from .passage_cache import CachedBackend
+
+    if isinstance(backend, CachedBackend):
+        backend.cache.close()
+        backend = backend.backend
+    if hasattr(backend, 'aclose'):
+        await backend.aclose()
+    else:
+        backend.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
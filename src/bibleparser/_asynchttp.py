@@ -0,0 +1,144 @@
+"""
+Minimal HTTP/1.1 message reading and writing over asyncio streams.
+Only what the async client, the stub servers and the parse server need: no pipelining, no trailers, no compression.
+"""
+from http import HTTPStatus
+
+
+_MAX_LINE = 65536
+_MAX_HEADERS = 100
+
+
+class HTTPProtocolError(Exception):
+    pass
+
+
+class BodyTooLarge(HTTPProtocolError):
+    """
+    Raised by read_request() when the body is longer than max_body. The rest of the body is left unread.
+    """
+
+
+async def read_response(reader) -> tuple:
+    """
+    Read one response and return (status, reason, headers, body).
+    Header names are lowercased.
+    """
+    line = await _read_line(reader)
+    if not line:
+        raise ConnectionResetError('Connection closed before a response was received.')
+    try:
+        version, status, *reason = line.split(None, 2)
+        status = int(status)
+    except ValueError:
+        raise HTTPProtocolError(f'Invalid status line: {line!r}') from None
+    if not version.startswith('HTTP/1.'):
+        raise HTTPProtocolError(f'Invalid status line: {line!r}')
+
+    headers = await _read_headers(reader)
+    if status < 200 or status in (204, 304):
+        body = b''
+    else:
+        body = await _read_body(reader, headers, until_eof=True)
+    return (status, reason[0] if reason else '', headers, body)
+
+
+async def read_request(reader, max_body:int=None) -> tuple:
+    """
+    Read one request and return (method, target, headers, body), or None if the connection was closed between requests.
+    Header names are lowercased. Raises BodyTooLarge, before reading more of it than that, if the body is longer than max_body bytes.
+    """
+    line = await _read_line(reader)
+    if not line:
+        return None
+    try:
+        method, target, version = line.split()
+    except ValueError:
+        raise HTTPProtocolError(f'Invalid request line: {line!r}') from None
+    if not version.startswith('HTTP/1.'):
+        raise HTTPProtocolError(f'Unsupported version: {version!r}')
+
+    headers = await _read_headers(reader)
+    body = await _read_body(reader, headers, until_eof=False, max_body=max_body)
+    return (method, target, headers, body)
+
+
+def format_response(status:int, body:bytes=b'', content_type:str='application/json', keep_alive:bool=True) -> bytes:
+    """
+    Serialize a response with a Content-Length body.
+    """
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ''
+    head = (
+        f'HTTP/1.1 {status} {reason}\r\n'
+        f'Content-Type: {content_type}\r\n'
+        f'Content-Length: {len(body)}\r\n'
+        f'Connection: {"keep-alive" if keep_alive else "close"}\r\n'
+        '\r\n'
+    )
+    return head.encode('latin-1') + body
+
+
+def wants_keep_alive(headers:dict) -> bool:
+    """
+    Whether a peer's headers allow the connection to be reused (HTTP/1.1 defaults to keep-alive).
+    """
+    return headers.get('connection', '').lower() != 'close'
+
+
+async def _read_line(reader) -> str:
+    line = await reader.readline()
+    if len(line) > _MAX_LINE:
+        raise HTTPProtocolError('Line too long.')
+    return line.decode('latin-1').rstrip('\r\n')
+
+
+async def _read_headers(reader) -> dict:
+    headers = {}
+    while True:
+        line = await _read_line(reader)
+        if not line:
+            return headers
+        if len(headers) >= _MAX_HEADERS:
+            raise HTTPProtocolError('Too many headers.')
+        name, sep, value = line.partition(':')
+        if not sep:
+            raise HTTPProtocolError(f'Invalid header: {line!r}')
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_body(reader, headers:dict, until_eof:bool, max_body:int=None) -> bytes:
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        chunks = []
+        total = 0
+        while True:
+            size = (await _read_line(reader)).split(';', 1)[0].strip()
+            try:
+                size = int(size, 16)
+            except ValueError:
+                raise HTTPProtocolError(f'Invalid chunk size: {size!r}') from None
+            if size == 0:
+                # Skip any trailers.
+                while await _read_line(reader):
+                    pass
+                return b''.join(chunks)
+            total += size
+            if max_body is not None and total > max_body:
+                raise BodyTooLarge(f'Body is longer than {max_body} bytes.')
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    length = headers.get('content-length')
+    if length is not None:
+        try:
+            length = int(length)
+        except ValueError:
+            raise HTTPProtocolError(f'Invalid Content-Length: {length!r}') from None
+        if max_body is not None and length > max_body:
+            raise BodyTooLarge(f'Body is longer than {max_body} bytes.')
+        return await reader.readexactly(length)
+
+    # A response without a length runs until the server closes the connection. A request without one has no body.
+    return await reader.read() if until_eof else b''
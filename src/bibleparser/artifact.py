@@ -0,0 +1,88 @@
+"""
+A prebuilt, serialized copy of the lookup tables the parser otherwise builds on first use
+(the verse-count arrays, the fuzzy book index and the number-word pattern).
+
+Loading it is cheaper than building them, which matters for cold starts (eg. on AWS Lambda). Build it as part of deployment with:
+    python -m bibleparser.artifact
+It's written next to the package by default; set BIBLEPARSER_ARTIFACT to use another path.
+If the file is missing or was built by an incompatible version, everything is simply built as usual.
+Each table is stored with the data it was built from (eg. the number words), and only used if that still matches this version's.
+"""
+import marshal
+import os
+import sys
+
+
+FORMAT = 2
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_precomputed.marshal')
+
+_contents = None
+
+
+def path() -> str:
+    return os.environ.get('BIBLEPARSER_ARTIFACT') or DEFAULT_PATH
+
+
+def get(name:str, source):
+    """
+    Return a table from the artifact, or None if there's no usable artifact or the table wasn't built from source.
+    """
+    global _contents
+    if _contents is None:
+        _contents = _load(path())
+    entry = _contents.get(name)
+    if not entry or entry[0] != source:
+        return None
+    return entry[1]
+
+
+def reset():
+    """
+    Forget the loaded artifact, so the next get() reads it again.
+    """
+    global _contents
+    _contents = None
+
+
+def build(output:str=None) -> dict:
+    """
+    Compute the tables and write them to output (by default, path()).
+    """
+    from . import bibleparser, verse_table
+    from .fuzzy import FuzzyIndex
+
+    # Each table is stored as (the data it's built from, the table). See get().
+    contents = {
+        'format': FORMAT,
+        'byteorder': sys.byteorder,
+        'number_words_pattern': (bibleparser._NUMBERS, bibleparser._number_words_pattern()),
+        'book_index': (bibleparser._book_index_source(), FuzzyIndex(verse_table.BOOKS).state()),
+        'verse_table': (verse_table._CANON, verse_table._build_state()),
+    }
+    with open(output or path(), 'wb') as f:
+        marshal.dump(contents, f)
+    return contents
+
+
+def _load(path:str) -> dict:
+    try:
+        with open(path, 'rb') as f:
+            contents = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if not isinstance(contents, dict) or contents.get('format') != FORMAT or contents.get('byteorder') != sys.byteorder:
+        return {}
+    return contents
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m bibleparser.artifact', description='Prebuild the parser\'s lookup tables for faster cold starts.')
+    parser.add_argument('--output', help=f'where to write the artifact (default: {path()})')
+    args = parser.parse_args(argv)
+    build(args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+"""
+The interface fetch_passage() uses to get the text of a passage.
+"""
+
+
+class PassageBackend:
+    """
+    Something that can fetch the text of a canonical reference (eg. "John 3:16").
+    fetch() returns a dict with at least 'reference' and 'text', like bible-api's JSON.
+    Backends that can't do better than blocking get a fetch_async() that simply calls fetch().
+    """
+    def fetch(self, passage:str) -> dict:
+        raise NotImplementedError
+
+    async def fetch_async(self, passage:str) -> dict:
+        return self.fetch(passage)
@@ -0,0 +1,71 @@
+"""
+Parse many reference strings at once.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .bibleparser import parse_reference
+
+
+def parse_references(texts, workers:int=None, chunksize:int=256):
+    """
+    Parse each reference string in texts, yielding results in input order.
+    Each result is the string parse_reference() would return, or the exception it would raise (errors don't stop the batch).
+    Identical inputs within a batch are only parsed once.
+    If workers is set, chunks of chunksize unique inputs are spread across that many processes.
+    """
+    if chunksize < 1:
+        raise ValueError(f'chunksize must be at least 1: {chunksize!r}')
+    if workers is not None and workers < 1:
+        raise ValueError(f'workers must be at least 1: {workers!r}')
+
+    texts = iter(texts)
+    if not workers:
+        while True:
+            batch = list(islice(texts, chunksize))
+            if not batch:
+                return
+            yield from _resolve(batch, _parse_chunk)
+
+    # Keep one window of work queued in the pool while the previous one is being yielded.
+    window = chunksize * workers
+    executor = ProcessPoolExecutor(workers)
+    pending = None
+    try:
+        pending = _submit(executor, list(islice(texts, window)), chunksize)
+        while pending:
+            batch, futures = pending
+            pending = _submit(executor, list(islice(texts, window)), chunksize)
+            results = {}
+            for chunk, future in futures:
+                results.update(zip(chunk, future.result()))
+            for text in batch:
+                yield results[text]
+    finally:
+        # Don't leave work running if the caller stops iterating early.
+        if pending:
+            for _, future in pending[1]:
+                future.cancel()
+        executor.shutdown(wait=True)
+
+
+def _parse_chunk(texts:list) -> list:
+    results = []
+    for text in texts:
+        try:
+            results.append(parse_reference(text))
+        except Exception as e:
+            results.append(e)
+    return results
+
+def _resolve(batch:list, parse) -> list:
+    unique = list(dict.fromkeys(batch))
+    results = dict(zip(unique, parse(unique)))
+    return [results[text] for text in batch]
+
+def _submit(executor, batch:list, chunksize:int):
+    if not batch:
+        return None
+    unique = list(dict.fromkeys(batch))
+    chunks = [unique[i:i+chunksize] for i in range(0, len(unique), chunksize)]
+    return (batch, [(chunk, executor.submit(_parse_chunk, chunk)) for chunk in chunks])
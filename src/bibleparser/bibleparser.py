@@ -1,17 +1,36 @@
 import re
-import urllib.request
-import json
+import time
 
-from difflib import get_close_matches
+from . import artifact, instrument
+from .cache import LRUCache
+from .verse_table import BOOKS, BOOK_ORDINALS, max_chapter, verse_count
 
-from .book_chapter_verses import book_chapter_verses
+
+# The passage-fetching API is importable from here too, but its module (and the networking it needs) is only loaded on first use.
+_PASSAGE_API = {
+    'get_default_backend', 'set_default_backend',
+    'fetch_passage', 'fetch_passage_async', 'fetch_passages_async', 'get_passage',
+}
+
+def __getattr__(name):
+    if name in _PASSAGE_API:
+        from . import passages
+        return getattr(passages, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 def parse_reference(text:str) -> str:
     """
     Interpret a reference string into a standardized format.
     """
-    (book, chapter, verse_start, verse_end) = (x or "" for x in parse_parts(text))
+    return format_parts(parse_parts(text))
+
+
+def format_parts(parts:tuple) -> str:
+    """
+    Format a (book, chapter, verse_start, verse_end) tuple as a reference string, eg. "John 3:16-17".
+    """
+    (book, chapter, verse_start, verse_end) = (x or "" for x in parts)
     return f'{book} {chapter}:{verse_start}-{verse_end}'.strip(' :-')
 
 
@@ -20,20 +39,59 @@ def parse_parts(text:str) -> tuple:
     Parse the book, chapter, and verses from a reference string.
     Returns a tuple of (book, chapter, verse_start, verse_end).
     """
+    if instrument.hooks:
+        return _timed_parse_parts(text)
+    return _cached_parse(text, _parse_parts)
+
+def _cached_parse(text:str, parse, kind:str=None):
+    # parse(text), through the parse cache if it's enabled. kind keeps other parsers' entries apart from parse_parts()'.
+    cache = _parse_cache
+    if cache is None:
+        return parse(text)
+
+    # Parsing ignores extra whitespace, so inputs differing only in that share an entry.
+    key = ' '.join(text.split())
+    if kind is not None:
+        key = (kind, key)
+    result = cache.get(key, _MISSING)
+    if result is _MISSING:
+        try:
+            result = parse(text)
+        except ValueError as e:
+            # Cache failures too, so repeated junk input doesn't bypass the cache.
+            result = _ParseError(e.args)
+        cache.put(key, result)
+
+    if type(result) is _ParseError:
+        raise ValueError(*result.args)
+    return result
+
+def _parse_parts(text:str, stage=None) -> tuple:
+    # stage(name, fn, arg, tags) runs each stage: instrument.timed() when hooks are registered, otherwise fn(arg).
+    stage = stage or _untimed
+
     # Convert number words to digits.
-    text = digitize(text)
+    text = stage('digitize', digitize, text)
+
+    (book, chapter, verse_start, verse_end) = stage('filter', _split_words, text)
 
+    book = stage('format_book', format_book, book, _book_tags)
+    if not book:
+        raise ValueError(f'Could not parse book from "{text}".')
+
+    return stage('range_check', range_check, (book, chapter, verse_start, verse_end), _range_tags)
+
+def _untimed(name:str, fn, arg, tags=None):
+    return fn(arg)
+
+def _split_words(text:str) -> tuple:
     # Split on non-word characters.
     words = re.split(r'[^\w]+', text)
 
     # Filter out empty and filler words.
-    ignore = {
-        'chapter', 'ch',
-        'verse', 'verses', 'vs', 'v',
-        'through', 'thru', 'to',
-        'the', 'a', 'an',
-    }
-    words = [w for w in words if w and w not in ignore]
+    words = [w for w in words if w and w not in _FILLER_WORDS]
+    if not words:
+        raise ValueError(f'Could not parse book from "{text}".')
 
     # Special case for "X123" and similar patterns. Siri confuses "Acts" for "X".
     m = re.match(r'^([xX])(\d+)', words[0])
@@ -55,11 +113,79 @@ def parse_parts(text:str) -> tuple:
     verse_start = int(number_words.pop(0)) if number_words else None
     verse_end = int(number_words.pop(0)) if number_words else None
 
-    book = format_book(book)
-    if not book:
-        raise ValueError(f'Could not parse book from "{text}".')
+    return (book, chapter, verse_start, verse_end)
+
+def _timed_parse_parts(text:str) -> tuple:
+    # parse_parts(), reporting each stage to the instrumentation hooks.
+    parsed = False
+    def parse(text):
+        nonlocal parsed
+        parsed = True
+        return _parse_parts(text, instrument.timed)
+
+    tags = ()
+    start = time.perf_counter()
+    try:
+        return _cached_parse(text, parse)
+    except ValueError:
+        tags = ('error',)
+        raise
+    finally:
+        if not parsed:
+            tags += ('cache_hit',)
+        instrument.emit('parse', time.perf_counter() - start, tags)
+
+def _book_tags(given:str, book:str) -> tuple:
+    name = _book_key(given)
+    if name in BOOK_ORDINALS:
+        return ()
+    if name in _TOCANON:
+        return ('synonym',)
+    return ('fuzzy_match',) if book.lower() in BOOK_ORDINALS else ('unknown_book',)
+
+def _range_tags(given:tuple, parts:tuple) -> tuple:
+    return ('chapter_split',) if parts[1] != given[1] else ()
+
+_FILLER_WORDS = {
+    'chapter', 'ch',
+    'verse', 'verses', 'vs', 'v',
+    'through', 'thru', 'to',
+    'the', 'a', 'an',
+}
+
+# Opt-in result cache for parse_parts(). See enable_cache().
+_parse_cache = None
+_MISSING = object()
+
+class _ParseError:
+    __slots__ = ('args',)
+    def __init__(self, args):
+        self.args = args
+
+def enable_cache(maxsize:int=1024):
+    """
+    Cache the results of parse_parts() (and therefore parse_reference()) for up to maxsize distinct inputs.
+    Calling it again replaces the existing cache.
+    """
+    global _parse_cache
+    _parse_cache = LRUCache(maxsize)
+
+def disable_cache():
+    global _parse_cache
+    _parse_cache = None
+
+def cache_info():
+    """
+    Return the parse cache's (hits, misses, evictions, maxsize, currsize), or None if caching is disabled.
+    """
+    cache = _parse_cache
+    return cache.info() if cache is not None else None
+
+def cache_clear():
+    cache = _parse_cache
+    if cache is not None:
+        cache.clear()
 
-    return range_check((book, chapter, verse_start, verse_end))
 
 def range_check(parts:tuple) -> tuple:
     """
@@ -71,13 +197,14 @@ def range_check(parts:tuple) -> tuple:
         return parts
 
     booklow = book.lower()
-    if booklow not in book_chapter_verses:
+    if booklow not in BOOK_ORDINALS:
         return parts
 
-    max_chapter = max(book_chapter_verses[booklow].keys())
-    max_verse = book_chapter_verses[booklow][max_chapter]
+    if max_chapter(booklow) == 1 and 1 < chapter <= verse_count(booklow, 1) and verse_start is None:
+        # Books with one chapter are cited by verse: "Jude 3" is Jude 1:3.
+        return (book, 1, chapter, None)
 
-    if chapter > max_chapter:
+    if chapter > max_chapter(booklow):
         chapterstr = str(chapter)
         if len(chapterstr) == 4:
             verse_end = verse_start
@@ -95,129 +222,141 @@ def range_check(parts:tuple) -> tuple:
     return (book, chapter, verse_start, verse_end)
 
 
+# Number words (from one to ninety-nine) and certain homophones.
+_ONES = {
+    'one':'1', 'won':'1', 'went':'1',
+    'two':'2', # Don't convert to/too, as that may be part of a verse range (eg. "Genesis 1 1 to 3").
+    'three':'3',
+    'four':'4', 'for':'4',
+    'five':'5',
+    'six':'6', 'sicks':'6',
+    'seven':'7',
+    'eight':'8', 'ate':'8',
+    'nine':'9',
+}
+_TENS = {
+    'twenty':'20',
+    'thirty':'30',
+    'forty':'40', 'fourty':'40',
+    'fifty':'50',
+    'sixty':'60',
+    'seventy':'70',
+    'eighty':'80',
+    'ninety':'90',
+}
+_WORD2NUM = {
+    **_ONES,
+    **_TENS,
+    **{
+    'ten':'10',
+    'eleven':'11',
+    'twelve':'12',
+    'thirteen':'13',
+    'fourteen':'14',
+    'fifteen':'15',
+    'sixteen':'16',
+    'seventeen':'17',
+    'eighteen':'18',
+    'nineteen':'19',
+}}
+# Composite numbers like "forty-two".
+_COMPOSITES = {
+    f'{ten}-{one}': str(int(_TENS[ten]) + int(_ONES[one]))
+    for ten in _TENS for one in _ONES
+}
+_NUMBERS = {**_WORD2NUM, **_COMPOSITES}
+
+def _alternation(words) -> str:
+    # Longest first, so that "sixty" is tried before "six".
+    return '|'.join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+def _number_words_pattern() -> str:
+    # Composites come first so "forty-two" is matched whole rather than as "forty".
+    return r'\b(?:(?:' + _alternation(_TENS) + r')-(?:' + _alternation(_ONES) + r')|' + _alternation(_WORD2NUM) + r')\b'
+
+# Compiled once, on first use.
+_number_words_re = None
+
+def _replace_number_word(m) -> str:
+    return _NUMBERS[m.group(0).lower()]
+
 def digitize(text:str) -> str:
     """
     Convert number words (from one to ninety-nine) to digits.
     Supports certain homophones.
     """
-    ones = {
-        'one':'1', 'won':'1', 'went':'1',
-        'two':'2', # Don't convert to/too, as that may be part of a verse range (eg. "Genesis 1 1 to 3").
-        'three':'3',
-        'four':'4', 'for':'4',
-        'five':'5',
-        'six':'6', 'sicks':'6',
-        'seven':'7',
-        'eight':'8', 'ate':'8',
-        'nine':'9',
-    }
-    tens = {
-        'twenty':'20',
-        'thirty':'30',
-        'forty':'40', 'fourty':'40',
-        'fifty':'50',
-        'sixty':'60',
-        'seventy':'70',
-        'eighty':'80',
-        'ninety':'90',
-    }
-
-    # Handle composite numbers like "forty-two".
-    def digitize_composite(m):
-        parts = m.group(0).lower().split('-')
-        return str(int(tens[parts[0]]) + int(ones[parts[1]]))
-    pattern = r'\b(' + '|'.join(re.escape(key) for key in tens.keys()) + r')-(' + '|'.join(re.escape(key) for key in ones.keys()) + r')\b'
-    text = re.sub(pattern, digitize_composite, text, flags=re.IGNORECASE)
-
-    # Handle single numbers.
-    word2num = {
-        **ones,
-        **tens,
-        **{
-        'ten':'10',
-        'eleven':'11',
-        'twelve':'12',
-        'thirteen':'13',
-        'fourteen':'14',
-        'fifteen':'15',
-        'sixteen':'16',
-        'seventeen':'17',
-        'eighteen':'18',
-        'nineteen':'19',
-    }}
-    pattern = r'\b(' + '|'.join(re.escape(key) for key in word2num.keys()) + r')\b'
-    text = re.sub(pattern, lambda m: word2num[m.group(0).lower()], text, flags=re.IGNORECASE)
-
-    return text
-
+    global _number_words_re
+    if _number_words_re is None:
+        _number_words_re = re.compile(artifact.get('number_words_pattern', _NUMBERS) or _number_words_pattern(), flags=re.IGNORECASE)
+    return _number_words_re.sub(_replace_number_word, text)
+
+
+# Built once, the first time a book name is neither canonical nor a known synonym.
+_book_index = None
+
+def _fuzzy_book_index():
+    global _book_index
+    if _book_index is None:
+        from .fuzzy import FuzzyIndex
+        state = artifact.get('book_index', _book_index_source())
+        _book_index = FuzzyIndex.from_state(state) if state else FuzzyIndex(BOOKS)
+    return _book_index
+
+def _book_index_source() -> tuple:
+    # What a prebuilt book index must have been built from to be used (see artifact.get()).
+    return (BOOKS, _TOCANON)
+
+# Spoken and written ordinals for numbered books.
+_ORD2NUM = {
+    '1st':'1', 'first':'1', 'one':'1', 'won':'1',
+    '2nd':'2', 'second':'2', 'two':'2', 'to':'2', 'too':'2',
+    '3rd':'3', 'third':'3', 'three':'3',
+}
+
+# Synonyms, homophones and misinterpretations of book names.
+# These will map to the official book name in verse_table.BOOKS.
+_TOCANON = {
+    'roof':'ruth',
+    'psalm':'psalms', 'song':'psalms', 'songs':'psalms',
+    'proverb':'proverbs',
+    'song of songs':'song of solomon',
+    'name':'nahum',
+    'aim us':'amos', 'a moss':'amos', 'moss':'amos',
+    'habacuc':'habakkuk', 'habit cook':'habakkuk',
+    'hey guy':'haggai', 'hi guy':'haggai', 'hag eye':'haggai', 'haggy eye':'haggai',
+    'marc':'mark',
+    'x':'acts', 'ax':'acts', 'axe':'acts', 'ask':'acts',
+    'jon':'john', '1 jon':'1 john', '2 jon':'2 john', '3 jon':'3 john',
+    'phillipians':'philippians',
+    'tight us':'titus', 'tied us':'titus',
+    'june':'jude',
+    'revelations':'revelation',
+}
 
 def format_book(book:str) -> str:
     """
     Format the book name into a standardized format.
     Handles various synonyms, homophones, and misspellings.
     """
-    # Convert to lowercase and split on whitespace.
-    words = book.strip().lower().split()
+    book = _book_key(book)
 
-    # If the first word is an ordinal, convert it to a number.
-    ord2num = {
-        '1st':'1', 'first':'1', 'one':'1', 'won':'1',
-        '2nd':'2', 'second':'2', 'two':'2', 'to':'2', 'too':'2',
-        '3rd':'3', 'third':'3', 'three':'3',
-    }
-    if words[0] in ord2num:
-        words[0] = ord2num[words[0]]
-
-    book = ' '.join(words)
-
-    if book not in book_chapter_verses:
+    if book not in BOOK_ORDINALS:
         # Check for synonyms (psalm vs psalms, song of songs vs song of solomon), homophones (jon vs john), misinterpretations (june vs jude), etc.
-        # These will map to the official book name in the book_chapter_verses dict.
-        tocanon = {
-            'roof':'ruth',
-            'psalm':'psalms', 'song':'psalms', 'songs':'psalms',
-            'proverb':'proverbs',
-            'song of songs':'song of solomon',
-            'name':'nahum',
-            'aim us':'amos', 'a moss':'amos', 'moss':'amos',
-            'habacuc':'habakkuk', 'habit cook':'habakkuk',
-            'hey guy':'haggai', 'hi guy':'haggai', 'hag eye':'haggai', 'haggy eye':'haggai',
-            'marc':'mark',
-            'x':'acts', 'ax':'acts', 'axe':'acts', 'ask':'acts',
-            'jon':'john', '1 jon':'1 john', '2 jon':'2 john', '3 jon':'3 john',
-            'phillipians':'philippians',
-            'tight us':'titus', 'tied us':'titus',
-            'june':'jude',
-            'revelations':'revelation',
-        }
-        book = tocanon.get(book, book)
-
-    if book not in book_chapter_verses:
+        book = _TOCANON.get(book, book)
+
+    if book not in BOOK_ORDINALS:
         # Find closest match (with at least 60% similarity).
-        matches = get_close_matches(book, book_chapter_verses.keys(), n=1, cutoff=0.6)
-        book = matches[0] if matches else book
+        book = _fuzzy_book_index().best_match(book, cutoff=0.6) or book
 
     # Return the book, title-cased.
     return book.title()
 
+def _book_key(book:str) -> str:
+    # Convert to lowercase and split on whitespace.
+    words = book.strip().lower().split()
 
-def fetch_passage(text:str) -> dict:
-    passage = parse_reference(text)
-    if not passage:
-        return None
-
-    url = f'https://bible-api.com/{urllib.parse.quote(passage)}'
-    req = urllib.request.Request(url)
-    with urllib.request.urlopen(req) as res:
-        data = res.read().decode('utf-8')
-        data = json.loads(data)
-
-    return {
-        'input': text,
-        'parsed': passage,
-        'reference': data['reference'],
-        'text': data['text'],
-    }
+    # If the first word is an ordinal, convert it to a number.
+    if words[0] in _ORD2NUM:
+        words[0] = _ORD2NUM[words[0]]
 
-def get_passage(text:str) -> str:
-    return fetch_passage(text)['text']
+    return ' '.join(words)
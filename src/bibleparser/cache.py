@@ -0,0 +1,78 @@
+"""
+A small, thread-safe, size-bounded LRU cache.
+"""
+import time
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class LRUCache:
+    """
+    Maps keys to values, discarding the least recently used entry once maxsize is reached.
+    If ttl is set, entries also expire ttl seconds after they were stored.
+    """
+    def __init__(self, maxsize:int=1024, ttl:float=None):
+        if maxsize < 1:
+            raise ValueError(f'maxsize must be at least 1: {maxsize!r}')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._expires = {}
+        self._lock = Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """
+        Return the value for key (marking it as recently used), or default if it isn't cached.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            if self._expires and self._expires.get(key, float('inf')) <= time.monotonic():
+                del self._data[key], self._expires[key]
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value, ttl:float=None):
+        """
+        Store value under key, evicting the least recently used entry if the cache is full.
+        ttl, if given, is used for this entry instead of the cache's.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if ttl is not None:
+                self._expires[key] = time.monotonic() + ttl
+            else:
+                self._expires.pop(key, None)
+            while len(self._data) > self.maxsize:
+                evicted, _ = self._data.popitem(last=False)
+                self._expires.pop(evicted, None)
+                self._evictions += 1
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self.maxsize, len(self._data))
+
+    def clear(self):
+        """
+        Remove all entries and reset the statistics.
+        """
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+            self._hits = self._misses = self._evictions = 0
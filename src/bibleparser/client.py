@@ -0,0 +1,263 @@
+"""
+HTTP client for bible-api (or anything that serves the same JSON at /<passage>).
+
+Connections are kept alive and reused across requests, so only the first request to the host pays for the TCP and TLS handshakes.
+Blocking and asyncio requests use separate pools (asyncio streams belong to the event loop that opened them).
+asyncio is only imported by the async methods, so blocking use doesn't pay for it.
+"""
+import http.client
+import json
+import ssl
+import time
+from threading import Lock
+from urllib.parse import quote, urlsplit
+from weakref import WeakKeyDictionary
+
+from .backend import PassageBackend
+from .singleflight import SingleFlight
+
+
+DEFAULT_BASE_URL = 'https://bible-api.com'
+
+# Connection errors that mean a reused keep-alive connection was closed by the server while it sat idle.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class PassageFetchError(Exception):
+    """
+    Raised when the upstream API responds with an error status (or, for local backends, the HTTP status it would have responded with).
+    """
+    def __init__(self, status:int, reason:str, body:str=''):
+        super().__init__(f'{status} {reason}')
+        self.status = status
+        self.reason = reason
+        self.body = body
+
+
+class PassageClient(PassageBackend):
+    """
+    A thread-safe client with a pool of keep-alive connections.
+    Server errors (5xx) and rate limiting (429) are retried up to retries times, with exponential backoff starting at backoff seconds.
+    Set max_connections to 0 to close each connection after use.
+    Unless coalesce is False, concurrent requests for the same passage share one upstream request (and its result or error).
+    """
+    def __init__(self, base_url:str=DEFAULT_BASE_URL, connect_timeout:float=3.0, read_timeout:float=10.0, retries:int=2, backoff:float=0.25, max_connections:int=10, coalesce:bool=True):
+        url = urlsplit(base_url)
+        if url.scheme not in ('http', 'https') or not url.hostname:
+            raise ValueError(f'Invalid base URL: "{base_url}"')
+
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_connections = max_connections
+
+        self._connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self._https = url.scheme == 'https'
+        self._host = url.hostname
+        self._port = url.port
+        self._path = url.path.rstrip('/')
+        self._idle = []
+        self._lock = Lock()
+        self._async_idle = WeakKeyDictionary()
+        self._ssl_context = None
+        self._flights = SingleFlight() if coalesce else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def coalesced(self) -> int:
+        """
+        The number of requests that were served by another caller's identical in-flight request.
+        """
+        return self._flights.coalesced if self._flights is not None else 0
+
+    def fetch(self, passage:str) -> dict:
+        """
+        Fetch a passage (eg. "John 3:16") and return the decoded JSON response.
+        Raises PassageFetchError if the API responds with an error.
+        """
+        if self._flights is not None:
+            return self._flights.do(passage, lambda: self._fetch(passage))
+        return self._fetch(passage)
+
+    async def fetch_async(self, passage:str) -> dict:
+        """
+        Like fetch(), but without blocking the event loop.
+        """
+        if self._flights is not None:
+            return await self._flights.do_async(passage, lambda: self._fetch_async(passage))
+        return await self._fetch_async(passage)
+
+    def _fetch(self, passage:str) -> dict:
+        path = f'{self._path}/{quote(passage)}'
+        for attempt in range(self.retries + 1):
+            status, reason, body = self._request(path)
+            if not self._should_retry(status, attempt):
+                return self._decode(status, reason, body)
+            time.sleep(self.backoff * 2**attempt)
+
+    async def _fetch_async(self, passage:str) -> dict:
+        import asyncio
+
+        path = f'{self._path}/{quote(passage)}'
+        for attempt in range(self.retries + 1):
+            status, reason, body = await self._request_async(path)
+            if not self._should_retry(status, attempt):
+                return self._decode(status, reason, body)
+            await asyncio.sleep(self.backoff * 2**attempt)
+
+    def close(self):
+        """
+        Close all idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+            async_idle = [writer for writers in self._async_idle.values() for _,writer in writers]
+            self._async_idle.clear()
+        for conn in idle:
+            conn.close()
+        for writer in async_idle:
+            try:
+                writer.close()
+            except RuntimeError:
+                pass # Its event loop is already closed.
+
+    async def aclose(self):
+        """
+        Close all idle connections, waiting for the current event loop's to finish closing.
+        """
+        import asyncio
+
+        with self._lock:
+            writers = [writer for _,writer in self._async_idle.pop(asyncio.get_running_loop(), [])]
+        for writer in writers:
+            writer.close()
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        self.close()
+
+    def _should_retry(self, status:int, attempt:int) -> bool:
+        return attempt < self.retries and (status == 429 or status >= 500)
+
+    def _decode(self, status:int, reason:str, body:bytes) -> dict:
+        if status >= 400:
+            raise PassageFetchError(status, reason, body.decode('utf-8', 'replace'))
+        return json.loads(body)
+
+    def _request(self, path:str) -> tuple:
+        conn, reused = self._acquire()
+        try:
+            try:
+                res = self._send(conn, path)
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # The server closed the idle connection. Retry once on a fresh one.
+                conn.close()
+                conn, reused = self._connect(), False
+                res = self._send(conn, path)
+            body = res.read()
+        except BaseException:
+            conn.close()
+            raise
+
+        if res.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+        return (res.status, res.reason, body)
+
+    def _send(self, conn, path:str):
+        conn.request('GET', path, headers={'Accept': 'application/json'})
+        return conn.getresponse()
+
+    def _acquire(self) -> tuple:
+        with self._lock:
+            if self._idle:
+                return (self._idle.pop(), True)
+        return (self._connect(), False)
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_connections:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _connect(self):
+        conn = self._connection_class(self._host, self._port, timeout=self.connect_timeout)
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        return conn
+
+    async def _request_async(self, path:str) -> tuple:
+        import asyncio
+        from ._asynchttp import wants_keep_alive
+
+        loop = asyncio.get_running_loop()
+        stream, reused = await self._acquire_async(loop)
+        try:
+            try:
+                status, reason, headers, body = await self._send_async(stream, path)
+            except (asyncio.IncompleteReadError, *_STALE_CONNECTION_ERRORS):
+                if not reused:
+                    raise
+                # The server closed the idle connection. Retry once on a fresh one.
+                stream[1].close()
+                stream, reused = await self._connect_async(), False
+                status, reason, headers, body = await self._send_async(stream, path)
+        except BaseException:
+            stream[1].close()
+            raise
+
+        # Without a length the body ran to the end of the connection, so it can't be reused either.
+        if wants_keep_alive(headers) and ('content-length' in headers or 'transfer-encoding' in headers):
+            self._release_async(loop, stream)
+        else:
+            stream[1].close()
+        return (status, reason, body)
+
+    async def _send_async(self, stream:tuple, path:str) -> tuple:
+        import asyncio
+        from ._asynchttp import read_response
+
+        reader, writer = stream
+        host = self._host if self._port is None else f'{self._host}:{self._port}'
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: application/json\r\n\r\n'.encode('latin-1'))
+        await writer.drain()
+        return await asyncio.wait_for(read_response(reader), self.read_timeout)
+
+    async def _acquire_async(self, loop) -> tuple:
+        with self._lock:
+            idle = self._async_idle.get(loop)
+            if idle:
+                return (idle.pop(), True)
+        return (await self._connect_async(), False)
+
+    def _release_async(self, loop, stream:tuple):
+        with self._lock:
+            idle = self._async_idle.setdefault(loop, [])
+            if len(idle) < self.max_connections:
+                idle.append(stream)
+                return
+        stream[1].close()
+
+    async def _connect_async(self) -> tuple:
+        import asyncio
+
+        if self._https and self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        port = self._port or (443 if self._https else 80)
+        return await asyncio.wait_for(
+            asyncio.open_connection(self._host, port, ssl=self._ssl_context if self._https else None),
+            self.connect_timeout,
+        )
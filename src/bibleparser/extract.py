@@ -0,0 +1,266 @@
+"""
+Find the Bible references embedded in free text, such as sermon transcripts and chat logs.
+
+    with open('sermon.txt', encoding='utf-8') as f:
+        for span in iter_references(f):
+            print(span.start, span.end, span.text, span.parts)
+
+Book names are recognized with a trie over words, built from the canonical names, their ordinal forms ("first john", "1st john")
+and the synonyms format_book() accepts. A name only counts as a reference when a chapter number follows it, so "Mark my words" isn't one,
+and a synonym that's also an everyday word only when a verse follows too, so "ask 2 questions" isn't one either.
+Each candidate is then parsed with parse_parts(), so number words, filler words and range_check() apply just as they do for a single reference.
+"""
+import re
+from collections import namedtuple
+
+from .bibleparser import _FILLER_WORDS, _ONES, _ORD2NUM, _TENS, _TOCANON, _WORD2NUM, parse_parts
+from .verse_table import BOOKS, BOOK_ORDINALS, max_chapter, verse_count
+
+
+ReferenceSpan = namedtuple('ReferenceSpan', ['start', 'end', 'text', 'parts'])
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+# Characters allowed between a book and its chapter ("John 3", "Jn. 3") and between the numbers that follow ("3:16-17", "3.16&17").
+_CHAPTER_GAP = ' \t\r\n.'
+_NUMBER_GAP = ' \t\r\n.:-–&'
+_NUMBER_FILLER = _FILLER_WORDS | {'and'}
+
+# The most filler words in a row ("and the verse"), and the longest gap, allowed between a book and its numbers.
+# Past these a reference can't continue, so a long run of either doesn't hold text over waiting for one.
+_MAX_FILLER = 3
+_MAX_GAP = 32
+
+# Synonyms that are just other spellings of a name. The rest are speech-recognition mistakes that are also everyday words
+# ("ask 2 questions", "name 3 things"), so in free text they only count when a verse follows the chapter.
+_SPELLINGS = {'psalm', 'proverb', 'revelations', 'phillipians', 'habacuc', 'song of songs'}
+
+# Marks the end of a book name in the trie. Its value is how many numbers must follow the name.
+_END = ''
+
+# The most text carried over between chunks when no reference is in progress. Anything longer can't be the start of one.
+_MAX_CARRY = 256
+
+
+def iter_references(source, chunksize:int=65536, synonyms:bool=True):
+    """
+    Yield a ReferenceSpan(start, end, text, parts) for each reference found in source, a string or a text file object.
+    start and end are character offsets into the whole input, and parts is parse_parts()'s (book, chapter, verse_start, verse_end).
+    File objects are read chunksize characters at a time, so memory use doesn't grow with the input.
+    Synonyms that are everyday words (eg. "ask" for Acts) need a chapter and verse ("ask 2:1", but not "ask 2 questions").
+    synonyms=False only recognizes canonical book names, their ordinal forms and other spellings (eg. "psalm").
+    """
+    matcher = _matcher(synonyms)
+    if isinstance(source, str):
+        yield from _scan(source, 0, True, matcher)[0]
+        return
+
+    buffer = ''
+    offset = 0
+    while True:
+        chunk = source.read(chunksize)
+        if not chunk:
+            break
+        buffer += chunk
+        spans, consumed = _scan(buffer, offset, False, matcher)
+        yield from spans
+        buffer = buffer[consumed:]
+        offset += consumed
+    yield from _scan(buffer, offset, True, matcher)[0]
+
+
+class _NeedMore(Exception):
+    pass
+
+
+def _scan(text:str, offset:int, final:bool, matcher:tuple) -> tuple:
+    # Returns the spans found and how much of text was dealt with. Unless this is the end of the input, a reference that
+    # might continue past the end of text is left for the next call, as are the last few words, which might begin a name.
+    trie, starts, depth = matcher
+    spans = []
+    lowered = _lower(text)
+    limit = len(text) if final else _carry_start(text, depth)
+    pos = 0
+    while True:
+        m = starts.search(lowered, pos)
+        if m is None or m.start() >= limit:
+            break
+        try:
+            end = _match(lowered, m.start(), final, trie)
+        except _NeedMore:
+            return spans, m.start()
+        if end is None:
+            pos = m.start() + 1
+            continue
+
+        try:
+            parts = parse_parts(lowered[m.start():end])
+        except ValueError:
+            parts = None
+        if parts is None or not _in_range(parts):
+            # Look for a shorter name inside this one ("second John 3:16" is John 3:16, as 2 John has one chapter).
+            pos = m.start() + 1
+            continue
+        spans.append(ReferenceSpan(offset + m.start(), offset + end, text[m.start():end], parts))
+        pos = end
+    return spans, max(pos, limit)
+
+
+def _lower(text:str) -> str:
+    # Matching is done on lowercased text, which is much faster than a case-insensitive pattern.
+    # Offsets must still line up, so the few characters whose lowercase form is longer are left as they are.
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+    return lowered
+
+
+def _carry_start(text:str, words:int) -> int:
+    # The start of the last few words, unless they're implausibly long.
+    i = len(text)
+    for _ in range(words):
+        while i and text[i-1].isspace():
+            i -= 1
+        while i and not text[i-1].isspace():
+            i -= 1
+    return i if len(text) - i <= _MAX_CARRY else len(text)
+
+
+def _match(text:str, start:int, final:bool, trie:dict):
+    # Return the end offset of the reference starting at start in lowercased text, or None if there isn't one.
+    tokens = _TOKEN_RE.finditer(text, start)
+    seen = []
+
+    def token(i):
+        while len(seen) <= i:
+            t = next(tokens, None)
+            if not final and (t is None or t.end() == len(text)):
+                if t is None and seen and len(text) - seen[-1].end() > _MAX_GAP:
+                    return None
+                raise _NeedMore
+            if t is None:
+                return None
+            seen.append(t)
+        return seen[i]
+
+    # Walk the trie as far as the words allow, noting every complete book name on the way.
+    node = trie
+    books = []
+    i = 0
+    while True:
+        t = token(i)
+        if t is None or (i and not text[seen[i-1].end():t.start()].isspace()):
+            break
+        node = node.get(t.group())
+        if node is None:
+            break
+        i += 1
+        if _END in node:
+            books.append((i, node[_END]))
+
+    # Prefer the longest name ("song of songs 3" over "song").
+    for i, required in reversed(books):
+        end = _numbers(text, token, i, trie, required)
+        if end is not None:
+            return end
+    return None
+
+
+def _numbers(text:str, token, i:int, trie:dict, required:int=1):
+    # Return the end offset of the chapter and verse numbers starting at token i, or None if there are fewer than required.
+    values = 0
+    fillers = 0
+    end = None
+    prev = token(i-1)
+    prevword = None
+    while True:
+        t = token(i)
+        if t is None:
+            break
+        gap = text[prev.end():t.start()]
+        if len(gap) > _MAX_GAP or gap.strip(_NUMBER_GAP if values else _CHAPTER_GAP):
+            break
+
+        word = t.group()
+        if (word.isdigit() and word.isascii() and len(word) <= 4) or word in _WORD2NUM:
+            if values and word in trie:
+                # A number starting the next book's name ("Philemon 6 and 3 John 4") isn't one of this reference's.
+                following = token(i+1)
+                if following is not None and following.group() in trie[word] and text[t.end():following.start()].isspace():
+                    break
+            # "forty-two" is a single number.
+            if not (gap == '-' and prevword in _TENS and word in _ONES):
+                if values == 3:
+                    break
+                values += 1
+            end = t.end()
+            fillers = 0
+        elif word not in _NUMBER_FILLER or fillers == _MAX_FILLER:
+            break
+        else:
+            fillers += 1
+        prev = t
+        prevword = word
+        i += 1
+    return end if values >= required else None
+
+
+def _in_range(parts:tuple) -> bool:
+    book, chapter, verse = parts[0].lower(), parts[1], parts[2]
+    if chapter is None:
+        return False
+    if book not in BOOK_ORDINALS:
+        return True
+    return 0 < chapter <= max_chapter(book) and (verse is None or 0 < verse <= verse_count(book, chapter))
+
+
+# Built on first use for each value of synonyms.
+_matchers = {}
+
+def _matcher(synonyms:bool) -> tuple:
+    matcher = _matchers.get(synonyms)
+    if matcher is None:
+        # Each name, and how many numbers must follow it.
+        names = dict.fromkeys(BOOKS, 1)
+        names.update(dict.fromkeys(_SPELLINGS, 1))
+        if synonyms:
+            names.update((name, 1 if name in _SPELLINGS else 2) for name in _TOCANON)
+        for name, required in list(names.items()):
+            number, _, rest = name.partition(' ')
+            if number in ('1', '2', '3') and rest:
+                # Not "to" or "too", which are far more often just words in running text ("turn to John 3").
+                names.update((f'{word} {rest}', required) for word, n in _ORD2NUM.items() if n == number and word not in ('to', 'too'))
+
+        trie = {}
+        for name, required in names.items():
+            node = trie
+            for word in name.split():
+                node = node.setdefault(word, {})
+            node[_END] = required
+
+        # Candidates are found with one regex over all the names, so the trie is only walked where a name actually appears.
+        starts = re.compile(r'(?<![^\W_])' + _pattern(names) + r'\b')
+        depth = max(len(name.split()) for name in names)
+        matcher = _matchers[synonyms] = (trie, starts, depth)
+    return matcher
+
+
+def _pattern(names) -> str:
+    # A regex matching any of names (with any whitespace between words), factored into a trie of characters.
+    # Python's re tries each alternative of a flat alternation in turn, which is several times slower.
+    tree = {}
+    for name in names:
+        node = tree
+        for c in name:
+            node = node.setdefault(c, {})
+        node[_END] = {}
+
+    def alternation(node):
+        optional = _END in node
+        branches = [(r'\s+' if c == ' ' else re.escape(c)) + alternation(child) for c, child in sorted(node.items()) if c != _END]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 and not optional else '(?:' + '|'.join(branches) + ')'
+        return pattern + '?' if optional else pattern
+
+    return alternation(tree)
@@ -0,0 +1,87 @@
+"""
+Approximate string matching against a fixed set of keys.
+
+Returns the same result as difflib.get_close_matches(word, keys, n=1, cutoff=cutoff), but does the per-key work up front.
+Keys are sorted by length and indexed by character, which gives cheap upper bounds on each key's similarity.
+Candidates are scored from the highest bound down, so the full SequenceMatcher ratio is usually computed for only a few keys.
+"""
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from difflib import SequenceMatcher
+
+
+class FuzzyIndex:
+    """
+    A prebuilt index for finding the closest key to a misspelled word.
+    """
+    def __init__(self, keys):
+        keys = sorted(set(keys), key=lambda k: (len(k), k))
+        self._keys = keys
+        self._lengths = [len(k) for k in keys]
+        # Character postings: for each character, the (key position, count) of every key containing it.
+        self._postings = {}
+        for i,key in enumerate(keys):
+            for ch,count in Counter(key).items():
+                self._postings.setdefault(ch, []).append((i, count))
+
+    @classmethod
+    def from_state(cls, state:tuple):
+        """
+        Recreate an index from the output of state(), without recomputing it.
+        """
+        index = cls.__new__(cls)
+        index._keys, index._lengths, index._postings = state
+        return index
+
+    def state(self) -> tuple:
+        """
+        The index's precomputed tables, as plain (marshal-able) data.
+        """
+        return (self._keys, self._lengths, self._postings)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def best_match(self, word:str, cutoff:float=0.6) -> str:
+        """
+        Return the key most similar to word (with at least cutoff similarity), or None.
+        Ties are broken the same way as difflib: by the greater key.
+        """
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError(f'cutoff must be in [0.0, 1.0]: {cutoff!r}')
+
+        n = len(word)
+        # Similarity is at most 2*min(n,m)/(n+m), so only keys within this length window can reach the cutoff.
+        # The window is widened slightly so float rounding never excludes a key that sits exactly on the cutoff.
+        if cutoff > 0:
+            lo = bisect_left(self._lengths, n * cutoff / (2 - cutoff) - 1e-9)
+            hi = bisect_right(self._lengths, n * (2 - cutoff) / cutoff + 1e-9)
+        else:
+            lo, hi = 0, len(self._keys)
+
+        # Upper bound of each candidate's similarity from shared characters (difflib's quick_ratio).
+        common = [0] * len(self._keys)
+        for ch,count in Counter(word).items():
+            for i,keycount in self._postings.get(ch, ()):
+                common[i] += count if count < keycount else keycount
+        bounds = []
+        for i in range(lo, hi):
+            total = n + self._lengths[i]
+            bound = 2.0 * common[i] / total if total else 1.0
+            if bound >= cutoff:
+                bounds.append((bound, self._keys[i]))
+
+        # Score candidates from the highest bound down, and stop once no remaining candidate can beat (or tie) the best.
+        bounds.sort(reverse=True)
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        best = None
+        for bound, key in bounds:
+            if best is not None and bound < best[0]:
+                break
+            matcher.set_seq1(key)
+            score = matcher.ratio()
+            if score >= cutoff and (best is None or (score, key) > best):
+                best = (score, key)
+
+        return best[1] if best else None
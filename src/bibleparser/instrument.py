@@ -0,0 +1,156 @@
+"""
+Opt-in instrumentation of the parsing and fetching pipeline.
+
+A hook is any callable taking (stage, seconds, tags). Once one is registered, every parse reports how long each of its stages took:
+    digitize     converting number words to digits
+    filter       splitting into words and dropping filler words
+    format_book  resolving the book name, tagged 'synonym', 'fuzzy_match' or 'unknown_book' if it wasn't already canonical
+    range_check  tagged 'chapter_split' if a run-together chapter and verse (eg. "Matthew 2112") was split
+    parse        the whole of parse_parts(), tagged 'cache_hit' if it came from the parse cache (see enable_cache())
+    parse_list   parse_ranges()'s and fetch_passage()'s check for a list (eg. "Romans 8:28; 12:1-2"), tagged 'list' if it was one
+    fetch        the upstream request(s) of fetch_passage() and fetch_passage_async()
+    passage_cache  a CachedBackend lookup, tagged 'cache_hit' or 'cache_miss'
+A stage that raised is tagged 'error'.
+
+    metrics = MetricsAggregator()
+    add_hook(metrics)
+    parse_reference("matthew 2112")
+    print(metrics.prometheus())
+
+With no hooks registered, the pipeline runs exactly as before, apart from checking for them once per call.
+Hooks run synchronously in the calling thread, so they should be quick. Exceptions they raise propagate to the caller.
+Hooks aren't called for parses done in worker processes by parse_references().
+"""
+import time
+from bisect import bisect_left
+from threading import Lock
+
+
+# The registered hooks. Replaced rather than mutated, so it can be read without a lock. Only replaced with _hooks_lock held.
+hooks = ()
+_hooks_lock = Lock()
+
+def add_hook(hook):
+    """
+    Register hook to be called with (stage, seconds, tags) for each stage of the pipeline. Returns hook.
+    """
+    global hooks
+    with _hooks_lock:
+        hooks = hooks + (hook,)
+    return hook
+
+def remove_hook(hook):
+    """
+    Unregister hook. Raises ValueError if it isn't registered.
+    """
+    global hooks
+    with _hooks_lock:
+        if hook not in hooks:
+            raise ValueError(f'Hook is not registered: {hook!r}')
+        i = hooks.index(hook)
+        hooks = hooks[:i] + hooks[i+1:]
+
+def emit(stage:str, seconds:float, tags:tuple=()):
+    """
+    Report a stage's duration and outcome tags to every registered hook.
+    """
+    for hook in hooks:
+        hook(stage, seconds, tags)
+
+def timed(stage:str, fn, arg, tags=None):
+    """
+    Call fn(arg) and report how long it took as stage. tags(arg, result), if given, returns the stage's outcome tags.
+    """
+    start = time.perf_counter()
+    try:
+        result = fn(arg)
+    except Exception:
+        emit(stage, time.perf_counter() - start, ('error',))
+        raise
+    emit(stage, time.perf_counter() - start, tags(arg, result) if tags else ())
+    return result
+
+async def timed_async(stage:str, fn, arg, tags=None):
+    """
+    Like timed(), for a coroutine function.
+    """
+    start = time.perf_counter()
+    try:
+        result = await fn(arg)
+    except Exception:
+        emit(stage, time.perf_counter() - start, ('error',))
+        raise
+    emit(stage, time.perf_counter() - start, tags(arg, result) if tags else ())
+    return result
+
+
+# Histogram bucket upper bounds, in seconds: parse stages take microseconds, fetches milliseconds to seconds.
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 1e-3, 2.5e-3, 1e-2, 0.025, 0.1, 0.25, 1.0, 2.5, 10.0)
+
+
+class MetricsAggregator:
+    """
+    A hook that keeps a latency histogram for each stage and counts each stage's tags.
+    Thread-safe. Export with snapshot() (eg. to log from a Lambda) or prometheus().
+    """
+    def __init__(self, buckets:tuple=DEFAULT_BUCKETS):
+        if list(buckets) != sorted(set(buckets)):
+            raise ValueError(f'buckets must be increasing: {buckets!r}')
+        self.buckets = tuple(buckets)
+        self._lock = Lock()
+        self._stages = {}
+
+    def __call__(self, stage:str, seconds:float, tags:tuple=()):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                # [count, sum, per-bucket counts (the last is for anything slower than every bucket), tag counts]
+                stats = self._stages[stage] = [0, 0.0, [0] * (len(self.buckets) + 1), {}]
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2][bisect_left(self.buckets, seconds)] += 1
+            for tag in tags:
+                stats[3][tag] = stats[3].get(tag, 0) + 1
+
+    def snapshot(self) -> dict:
+        """
+        Return {stage: {'count', 'sum', 'buckets', 'tags'}}, where buckets is a list of cumulative (upper bound, count) pairs
+        ending with (inf, count), as in a Prometheus histogram, and tags maps each tag to the number of times it was reported.
+        """
+        with self._lock:
+            snapshot = {}
+            for stage, (count, total, counts, tags) in self._stages.items():
+                cumulative, buckets = 0, []
+                for bound, n in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += n
+                    buckets.append((bound, cumulative))
+                snapshot[stage] = {'count': count, 'sum': total, 'buckets': buckets, 'tags': dict(tags)}
+            return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def prometheus(self, prefix:str='bibleparser') -> str:
+        """
+        Return the metrics in the Prometheus text exposition format: a {prefix}_stage_seconds histogram and a {prefix}_stage_tags_total counter.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f'# HELP {prefix}_stage_seconds Time spent in each stage of the pipeline.',
+            f'# TYPE {prefix}_stage_seconds histogram',
+        ]
+        for stage, stats in snapshot.items():
+            for bound, count in stats['buckets']:
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {stats["sum"]!r}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        lines += [
+            f'# HELP {prefix}_stage_tags_total Outcomes reported by each stage.',
+            f'# TYPE {prefix}_stage_tags_total counter',
+        ]
+        for stage, stats in snapshot.items():
+            for tag, count in sorted(stats['tags'].items()):
+                lines.append(f'{prefix}_stage_tags_total{{stage="{stage}",tag="{tag}"}} {count}')
+        return '\n'.join(lines) + '\n'
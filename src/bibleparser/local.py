@@ -0,0 +1,213 @@
+"""
+An offline passage backend that reads a translation from a packed, memory-mapped file.
+
+File layout (integers are little-endian uint32):
+    magic           b'BPBIBLE1'
+    verse count     N, which must match verse_table.TOTAL_VERSES
+    id length       followed by the translation id (UTF-8), padded to a multiple of 4 bytes
+    offsets         N+1 byte offsets into the text, one per verse (by global ordinal) plus the end of the text
+    text            every verse's text in canonical order, UTF-8, each ending with a newline
+
+A passage is a contiguous run of verses, so its text is the slice between two offsets, with no per-verse lookups or copies.
+A list of passages (eg. "Romans 8:28,12:1-2") is one slice per range.
+
+Build a file from a JSON or CSV source with:
+    python -m bibleparser.local kjv.json kjv.bible --translation kjv
+The source is a list of {"book", "chapter", "verse", "text"} records (in JSON, optionally under a "verses" key).
+Books may be given by name or by number (1 = Genesis ... 66 = Revelation).
+"""
+import argparse
+import csv
+import json
+import mmap
+import re
+import struct
+import sys
+from array import array
+
+from .backend import PassageBackend
+from .bibleparser import _TOCANON, _book_key
+from .client import PassageFetchError
+from .reference import _parse_list
+from .verse_table import BOOKS, BOOK_ORDINALS, TOTAL_VERSES, max_chapter, verse_count, verse_ordinal
+
+
+MAGIC = b'BPBIBLE1'
+
+# A canonical reference, as produced by parse_reference(): "Book", "Book C", "Book C:V" or "Book C:V-V".
+_REFERENCE_RE = re.compile(r'((?:\d )?\D.*?)(?: (\d+)(?::(\d+)(?:-(\d+))?)?)?')
+
+
+class LocalBible(PassageBackend):
+    """
+    A passage backend backed by a file written by build().
+    Unknown passages raise PassageFetchError with status 404, like bible-api.
+    """
+    def __init__(self, path:str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._view = view = memoryview(self._mmap)
+        if view[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'Not a packed Bible file: "{path}"')
+        count, idlength = struct.unpack_from('<II', view, len(MAGIC))
+        if count != TOTAL_VERSES:
+            raise ValueError(f'"{path}" has {count} verses; expected {TOTAL_VERSES}.')
+
+        pos = len(MAGIC) + 8
+        self.translation_id = bytes(view[pos:pos+idlength]).decode('utf-8')
+        pos += _padded(idlength)
+        offsets = view[pos:pos + 4*(count+1)]
+        if sys.byteorder == 'little':
+            self._offsets = offsets.cast('I')
+        else:
+            self._offsets = array('I', offsets)
+            self._offsets.byteswap()
+        self._text = view[pos + 4*(count+1):]
+
+    def close(self):
+        """
+        Unmap the file. Views returned by text_view() must be released first.
+        """
+        for view in (self._offsets, self._text, self._view):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def fetch(self, passage:str) -> dict:
+        return {
+            'reference': passage,
+            'text': ''.join(str(self.text_view(first, last), 'utf-8') for first, last in self.ranges(passage)),
+            'translation_id': self.translation_id,
+        }
+
+    def ranges(self, passage:str) -> list:
+        """
+        Return the (first, last) global ordinals of each range in a canonical reference or list of references (eg. "Romans 8:28,12:1-2").
+        """
+        try:
+            references = _parse_list(passage)
+        except ValueError:
+            raise PassageFetchError(404, 'Not Found', f'Passage not found: "{passage}"') from None
+        if references is None:
+            return [self.ordinals(passage)]
+        return [r.ordinals for r in references]
+
+    def ordinals(self, passage:str) -> tuple:
+        """
+        Return the global ordinals of the first and last verses of a canonical reference.
+        """
+        # Passages are already parsed, so they're matched exactly rather than re-interpreted like dictation.
+        m = _REFERENCE_RE.fullmatch(passage.strip())
+        try:
+            if not m:
+                raise KeyError(passage)
+            book, chapter, verse_start, verse_end = (int(x) if x and x.isdigit() else x for x in m.groups())
+            book = book.lower()
+            if chapter is None:
+                return (verse_ordinal(book, 1, 1), verse_ordinal(book, max_chapter(book), verse_count(book, max_chapter(book))))
+            if verse_start is None:
+                return (verse_ordinal(book, chapter, 1), verse_ordinal(book, chapter, verse_count(book, chapter)))
+            # A range that runs past the end of the chapter stops at its last verse.
+            verse_end = min(verse_end or verse_start, verse_count(book, chapter))
+            if verse_end < verse_start:
+                raise KeyError(passage)
+            return (verse_ordinal(book, chapter, verse_start), verse_ordinal(book, chapter, verse_end))
+        except KeyError:
+            raise PassageFetchError(404, 'Not Found', f'Passage not found: "{passage}"') from None
+
+    def text_view(self, first:int, last:int) -> memoryview:
+        """
+        Return the UTF-8 text of verses first through last (by global ordinal) as a view into the file.
+        """
+        return self._text[self._offsets[first]:self._offsets[last+1]]
+
+
+def build(records, path:str, translation:str=''):
+    """
+    Write a packed Bible file from (book, chapter, verse, text) records.
+    Returns the number of records skipped because the verse doesn't exist in verse_table's versification,
+    including those from books it doesn't have (eg. the Apocrypha).
+    """
+    texts = [b''] * TOTAL_VERSES
+    skipped = 0
+    for book, chapter, verse, text in records:
+        book = _book(book)
+        try:
+            if book is None:
+                raise KeyError(book)
+            ordinal = verse_ordinal(book, int(chapter), int(verse))
+        except KeyError:
+            skipped += 1
+            continue
+        texts[ordinal] = text.strip().encode('utf-8') + b'\n'
+
+    offsets = array('I', [0])
+    for text in texts:
+        offsets.append(offsets[-1] + len(text))
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+
+    translation = translation.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<II', TOTAL_VERSES, len(translation)))
+        f.write(translation.ljust(_padded(len(translation)), b'\0'))
+        f.write(offsets.tobytes())
+        for text in texts:
+            f.write(text)
+    return skipped
+
+
+def read_records(path:str):
+    """
+    Yield (book, chapter, verse, text) records from a JSON or CSV source file.
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            rows = csv.DictReader(f)
+        else:
+            rows = json.load(f)
+            if isinstance(rows, dict):
+                rows = rows['verses']
+        for row in rows:
+            yield (row['book'], row['chapter'], row['verse'], row['text'])
+
+
+def _book(book) -> str:
+    # The canonical name of a source's book, or None if verse_table doesn't have it.
+    # Only exact names (and synonyms like "Song of Songs") count: format_book()'s fuzzy matching would file Tobit under Titus.
+    if isinstance(book, int) or book.isdigit():
+        return BOOKS[int(book) - 1] if 1 <= int(book) <= len(BOOKS) else None
+    if not book.strip():
+        return None
+    book = _book_key(book)
+    book = _TOCANON.get(book, book)
+    return book if book in BOOK_ORDINALS else None
+
+
+def _padded(length:int) -> int:
+    return (length + 3) // 4 * 4
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bibleparser.local', description='Build a packed Bible file for LocalBible from a JSON or CSV source.')
+    parser.add_argument('source', help='JSON or CSV file of book, chapter, verse, text records')
+    parser.add_argument('output', help='path of the packed file to write')
+    parser.add_argument('--translation', default='', help='translation id to record in the file')
+    args = parser.parse_args(argv)
+
+    skipped = build(read_records(args.source), args.output, args.translation)
+    if skipped:
+        print(f'Skipped {skipped} verses not in the versification (or from books it doesn\'t have).', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""
+Caching for fetched passages.
+
+Scripture text doesn't change, so a passage only needs to be fetched once. PassageCache keeps recent passages in memory and,
+given a path, also in a sqlite database that survives restarts and can be shared by several worker processes.
+Entries are keyed on the canonical reference from parse_reference() (eg. "John 3:16").
+
+    cache = PassageCache('passages.db', ttl=30*24*3600)
+    set_default_backend(CachedBackend(PassageClient(), cache))
+    cache.warm(["John 3:16", "Psalm 23", "Romans 8:28"])
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from . import instrument
+from .backend import PassageBackend
+from .cache import CacheInfo, LRUCache
+
+
+PassageCacheInfo = namedtuple('PassageCacheInfo', ['memory', 'disk'])
+
+# How many hits' access times SqliteCache collects before writing them to the database.
+_TOUCH_BATCH = 64
+
+
+class SqliteCache:
+    """
+    A persistent key/value cache of JSON-serializable values in a sqlite database.
+    Holds at most maxsize entries (discarding the least recently used) and, if ttl is set, expires entries ttl seconds after they were stored.
+    Safe to share between threads and between processes. Access times are written in batches (and before each put()),
+    so other processes see recent hits a little late, which only affects which entries are evicted first.
+    """
+    def __init__(self, path:str, maxsize:int=100000, ttl:float=None):
+        if maxsize < 1:
+            raise ValueError(f'maxsize must be at least 1: {maxsize!r}')
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+        self._used = {}
+
+        with self._db() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS passages (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored REAL NOT NULL, used REAL NOT NULL)')
+            db.execute('CREATE INDEX IF NOT EXISTS passages_used ON passages (used)')
+
+    def __len__(self) -> int:
+        return self._db().execute('SELECT COUNT(*) FROM passages').fetchone()[0]
+
+    def get(self, key:str, default=None):
+        found = self._lookup(key)
+        return default if found is None else json.loads(found[0])
+
+    def _lookup(self, key:str) -> tuple:
+        # Returns (the value's JSON, seconds until it expires or None), or None if key isn't cached.
+        now = time.time()
+        db = self._db()
+        row = db.execute('SELECT value, stored FROM passages WHERE key = ?', (key,)).fetchone()
+        if row is not None and self.ttl is not None and row[1] + self.ttl <= now:
+            with db:
+                db.execute('DELETE FROM passages WHERE key = ? AND stored = ?', (key, row[1]))
+            row = None
+        if row is None:
+            self._count(misses=1)
+            return None
+
+        with self._lock:
+            self._used[key] = now
+            flush = len(self._used) >= _TOUCH_BATCH
+        if flush:
+            self._flush()
+        self._count(hits=1)
+        return (row[0], None if self.ttl is None else row[1] + self.ttl - now)
+
+    def put(self, key:str, value):
+        self._store(key, json.dumps(value))
+
+    def _store(self, key:str, text:str):
+        # Evictions go by access time, so pending ones are written first.
+        self._flush()
+        now = time.time()
+        db = self._db()
+        with db:
+            db.execute('INSERT OR REPLACE INTO passages (key, value, stored, used) VALUES (?, ?, ?, ?)', (key, text, now, now))
+            evicted = db.execute(
+                'DELETE FROM passages WHERE key IN (SELECT key FROM passages ORDER BY used LIMIT max(0, (SELECT COUNT(*) FROM passages) - ?))',
+                (self.maxsize,),
+            ).rowcount
+        if evicted:
+            self._count(evictions=evicted)
+
+    def info(self) -> CacheInfo:
+        currsize = len(self)
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self.maxsize, currsize)
+
+    def clear(self):
+        """
+        Remove all entries (for every process sharing the database) and reset this instance's statistics.
+        """
+        with self._db() as db:
+            db.execute('DELETE FROM passages')
+        with self._lock:
+            self._hits = self._misses = self._evictions = 0
+            self._used = {}
+
+    def close(self):
+        """
+        Write pending access times and close this thread's database connection.
+        """
+        self._flush()
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+    def _db(self):
+        # sqlite3 connections can't be shared between threads, so each thread gets its own.
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def _flush(self):
+        with self._lock:
+            used, self._used = self._used, {}
+        if used:
+            with self._db() as db:
+                db.executemany('UPDATE passages SET used = ? WHERE key = ?', [(t, key) for key, t in used.items()])
+
+    def _count(self, hits:int=0, misses:int=0, evictions:int=0):
+        with self._lock:
+            self._hits += hits
+            self._misses += misses
+            self._evictions += evictions
+
+
+class PassageCache:
+    """
+    A two-tier passage cache: an in-memory LRU cache in front of an optional SqliteCache at path.
+    Passages are kept as JSON, so get() returns a new copy each time and callers may modify it.
+    get_async() and put_async() use the disk tier from a worker thread, so sqlite (which may wait on another process's lock)
+    doesn't block the event loop.
+    """
+    def __init__(self, path:str=None, maxsize:int=1024, disk_maxsize:int=100000, ttl:float=None):
+        self.memory = LRUCache(maxsize, ttl=ttl)
+        self.disk = SqliteCache(path, maxsize=disk_maxsize, ttl=ttl) if path else None
+        self._executor = None
+
+    def get(self, passage:str) -> dict:
+        """
+        Return the cached upstream data for a canonical reference, or None.
+        """
+        text = self.memory.get(passage)
+        if text is None and self.disk is not None:
+            text = self._promote(passage)
+        return None if text is None else json.loads(text)
+
+    async def get_async(self, passage:str) -> dict:
+        text = self.memory.get(passage)
+        if text is None and self.disk is not None:
+            text = await self._in_thread(self._promote, passage)
+        return None if text is None else json.loads(text)
+
+    def _promote(self, passage:str):
+        # The passage's JSON from the disk tier, copied into memory, or None.
+        found = self.disk._lookup(passage)
+        if found is None:
+            return None
+        # It expires from memory when it would have on disk, not a full ttl from now.
+        text, remaining = found
+        self.memory.put(passage, text, remaining)
+        return text
+
+    def put(self, passage:str, data:dict):
+        text = json.dumps(data)
+        self.memory.put(passage, text)
+        if self.disk is not None:
+            self.disk._store(passage, text)
+
+    async def put_async(self, passage:str, data:dict):
+        text = json.dumps(data)
+        self.memory.put(passage, text)
+        if self.disk is not None:
+            await self._in_thread(self.disk._store, passage, text)
+
+    def _in_thread(self, fn, *args):
+        # One thread, so it holds the only extra sqlite connection and close() can close it.
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(1)
+        return asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def info(self) -> PassageCacheInfo:
+        return PassageCacheInfo(self.memory.info(), self.disk.info() if self.disk is not None else None)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.submit(self.disk.close).result()
+            self._executor.shutdown()
+            self._executor = None
+        if self.disk is not None:
+            self.disk.close()
+
+    def warm(self, references, backend=None) -> int:
+        """
+        Fetch and cache any of the given references (eg. popular passages at deploy time) that aren't cached yet.
+        They're cached under the same queries fetch_passage() makes for them (eg. one per book for a list). Returns the number fetched.
+        """
+        from .bibleparser import parse_reference
+        from .passages import _list_queries, get_default_backend
+
+        backend = backend or get_default_backend()
+        if isinstance(backend, CachedBackend):
+            backend = backend.backend
+
+        queries = []
+        for reference in references:
+            queries += _list_queries(reference) or [parse_reference(reference)]
+
+        fetched = 0
+        for passage in dict.fromkeys(queries):
+            if self.get(passage) is None:
+                self.put(passage, backend.fetch(passage))
+                fetched += 1
+        return fetched
+
+
+class CachedBackend(PassageBackend):
+    """
+    Wraps a backend (eg. a PassageClient) so that passages are served from cache when possible.
+    """
+    def __init__(self, backend, cache:PassageCache):
+        self.backend = backend
+        self.cache = cache
+
+    def fetch(self, passage:str) -> dict:
+        data = self._get(passage)
+        if data is None:
+            data = self.backend.fetch(passage)
+            self.cache.put(passage, data)
+        return data
+
+    async def fetch_async(self, passage:str) -> dict:
+        if instrument.hooks:
+            data = await instrument.timed_async('passage_cache', self.cache.get_async, passage, _cache_tags)
+        else:
+            data = await self.cache.get_async(passage)
+        if data is None:
+            data = await self.backend.fetch_async(passage)
+            await self.cache.put_async(passage, data)
+        return data
+
+    def _get(self, passage:str) -> dict:
+        if instrument.hooks:
+            return instrument.timed('passage_cache', self.cache.get, passage, _cache_tags)
+        return self.cache.get(passage)
+
+
+def _cache_tags(passage:str, data:dict) -> tuple:
+    return ('cache_miss',) if data is None else ('cache_hit',)
@@ -0,0 +1,116 @@
+"""
+Fetching the text of parsed references.
+
+These are also available from bibleparser.bibleparser, but live here so that parse-only callers never import the networking code.
+"""
+from . import instrument
+from .bibleparser import parse_reference
+from .client import PassageClient
+from .reference import _parse_list, format_ranges
+
+
+# The backend used by fetch_passage() when none is given. See set_default_backend().
+_default_backend = None
+
+def get_default_backend():
+    """
+    Return the default backend, creating a PassageClient for bible-api on first use.
+    """
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = PassageClient()
+    return _default_backend
+
+def set_default_backend(backend):
+    """
+    Replace the default backend, eg. with PassageClient(base_url=..., read_timeout=...).
+    """
+    global _default_backend
+    _default_backend = backend
+
+
+def fetch_passage(text:str, backend=None) -> dict:
+    """
+    Parse a reference and fetch its text.
+    A list or cross-chapter range (eg. "Romans 8:28; 12:1-2") is fetched with one request per book (eg. "Romans 8:28,12:1-2").
+    Lists are parsed as parse_ranges() does, so "John 3:16, 18" is John 3:16 and John 3:18, where parse_reference() gives John 3:16-18.
+    """
+    backend = backend or get_default_backend()
+    queries = _list_queries(text)
+    if queries is not None:
+        return _list_result(text, queries, [_fetch(backend, query) for query in queries])
+
+    passage = parse_reference(text)
+    if not passage:
+        return None
+
+    data = _fetch(backend, passage)
+    return _passage_result(text, passage, data)
+
+async def fetch_passage_async(text:str, backend=None) -> dict:
+    """
+    Like fetch_passage(), but without blocking the event loop.
+    """
+    backend = backend or get_default_backend()
+    queries = _list_queries(text)
+    if queries is not None:
+        import asyncio
+        return _list_result(text, queries, await asyncio.gather(*(_fetch_async(backend, query) for query in queries)))
+
+    passage = parse_reference(text)
+    if not passage:
+        return None
+
+    data = await _fetch_async(backend, passage)
+    return _passage_result(text, passage, data)
+
+async def fetch_passages_async(texts, concurrency:int=8, backend=None) -> list:
+    """
+    Fetch several passages, with at most concurrency upstream requests in flight at once.
+    Returns the results in input order. A failed item's result is the exception it raised (errors don't stop the others).
+    """
+    import asyncio
+
+    if concurrency < 1:
+        raise ValueError(f'concurrency must be at least 1: {concurrency!r}')
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(text):
+        async with semaphore:
+            return await fetch_passage_async(text, backend)
+
+    return await asyncio.gather(*(fetch(text) for text in texts), return_exceptions=True)
+
+def _fetch(backend, passage:str) -> dict:
+    if instrument.hooks:
+        return instrument.timed('fetch', backend.fetch, passage)
+    return backend.fetch(passage)
+
+async def _fetch_async(backend, passage:str) -> dict:
+    if instrument.hooks:
+        return await instrument.timed_async('fetch', backend.fetch_async, passage)
+    return await backend.fetch_async(passage)
+
+def _list_queries(text:str):
+    # The queries for a list or cross-chapter range, or None for a single reference (which is fetched exactly as before).
+    references = _parse_list(text)
+    return format_ranges(references) if references is not None else None
+
+def _list_result(text:str, queries:list, data:list) -> dict:
+    if len(data) == 1:
+        return _passage_result(text, queries[0], data[0])
+    return _passage_result(text, '; '.join(queries), {
+        'reference': '; '.join(d['reference'] for d in data),
+        'text': ''.join(d['text'] for d in data),
+    })
+
+def _passage_result(text:str, passage:str, data:dict) -> dict:
+    return {
+        'input': text,
+        'parsed': passage,
+        'reference': data['reference'],
+        'text': data['text'],
+    }
+
+def get_passage(text:str, backend=None) -> str:
+    return fetch_passage(text, backend)['text']
@@ -0,0 +1,357 @@
+"""
+Validated passage references that compare, sort, and merge by verse ordinal.
+
+    a = Reference.parse("john three sixteen")     # John 3:16
+    b = Reference('John', 3, 17, 18)              # John 3:17-18
+    merge_references([b, a])                      # [John 3:16-18]
+    parse_ranges("Romans 8:28; 12:1-2")           # [Romans 8:28, Romans 12:1-2]
+
+A Reference is a contiguous run of verses within one book, stored as the global ordinals (see verse_table) of its first and last verses,
+so equality, hashing and ordering never look at strings. For large lists, sorted(references, key=Reference.sort_key) compares plain ints
+without calling back into Python.
+"""
+import re
+from itertools import groupby
+from operator import attrgetter
+
+from . import instrument
+from .bibleparser import _cached_parse, digitize, format_book, format_parts, parse_parts
+from .verse_table import BOOKS, BOOK_ORDINALS, book_ordinal, max_chapter, verse_count, verse_location, verse_ordinal
+
+
+class Reference:
+    """
+    An immutable passage, from the first verse of (book, chapter, verse_start) to the last verse of (book, chapter_end, verse_end).
+    Omitting verse_start covers whole chapters, and omitting chapter covers the whole book. chapter_end defaults to chapter.
+    Raises ValueError if the passage doesn't exist in verse_table's versification.
+    """
+    __slots__ = ('_book', '_start', '_end', '_key')
+
+    def __init__(self, book:str, chapter:int=None, verse_start:int=None, verse_end:int=None, chapter_end:int=None):
+        given = (book, chapter, verse_start, verse_end, chapter_end)
+        try:
+            b = book_ordinal(book)
+            if chapter is None:
+                if verse_start is not None or verse_end is not None or chapter_end is not None:
+                    raise ValueError(f'A verse or chapter range needs a chapter: {book!r}')
+                chapter, chapter_end = 1, max_chapter(b)
+            elif chapter_end is None:
+                chapter_end = chapter
+
+            if verse_start is None:
+                if verse_end is not None:
+                    raise ValueError(f'verse_end needs a verse_start: {book!r}')
+                start = verse_ordinal(b, chapter, 1)
+                end = verse_ordinal(b, chapter_end, verse_count(b, chapter_end))
+            else:
+                if verse_end is None:
+                    verse_end = verse_start if chapter_end == chapter else verse_count(b, chapter_end)
+                start = verse_ordinal(b, chapter, verse_start)
+                end = verse_ordinal(b, chapter_end, verse_end)
+        except KeyError:
+            raise ValueError(f'No such passage: {given!r}') from None
+        if end < start:
+            raise ValueError(f'Passage ends before it starts: {given!r}')
+        self._set(b, start, end)
+
+    @classmethod
+    def from_ordinals(cls, start:int, end:int=None):
+        """
+        Return the Reference for global verse ordinals start through end (default start), which must be in the same book.
+        """
+        if end is None:
+            end = start
+        try:
+            first, last = verse_location(start)[0], verse_location(end)[0]
+        except KeyError:
+            raise ValueError(f'No such verse ordinals: {(start, end)!r}') from None
+        if first != last:
+            raise ValueError(f'A Reference can\'t span books: {(start, end)!r}')
+        if end < start:
+            raise ValueError(f'Passage ends before it starts: {(start, end)!r}')
+        return cls._new(book_ordinal(first), start, end)
+
+    @classmethod
+    def from_parts(cls, parts:tuple):
+        """
+        Return the Reference for a (book, chapter, verse_start, verse_end) tuple, as returned by parse_parts().
+        """
+        return cls(*parts)
+
+    @classmethod
+    def parse(cls, text:str):
+        """
+        Parse a reference string (see parse_parts()) into a Reference.
+        """
+        return cls(*parse_parts(text))
+
+    @classmethod
+    def _new(cls, book:int, start:int, end:int):
+        # Without validation, for ordinals known to be good.
+        reference = cls.__new__(cls)
+        reference._set(book, start, end)
+        return reference
+
+    def _set(self, book:int, start:int, end:int):
+        object.__setattr__(self, '_book', book)
+        object.__setattr__(self, '_start', start)
+        object.__setattr__(self, '_end', end)
+        # Both ordinals in one int, so that comparing keys orders by first verse, then by last verse.
+        object.__setattr__(self, '_key', start << 16 | end)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        return (Reference.from_ordinals, (self._start, self._end))
+
+    @property
+    def book(self) -> str:
+        return BOOKS[self._book].title()
+
+    @property
+    def start(self) -> tuple:
+        """
+        The (book, chapter, verse) of the first verse.
+        """
+        book, chapter, verse = verse_location(self._start)
+        return (book.title(), chapter, verse)
+
+    @property
+    def end(self) -> tuple:
+        """
+        The (book, chapter, verse) of the last verse.
+        """
+        book, chapter, verse = verse_location(self._end)
+        return (book.title(), chapter, verse)
+
+    @property
+    def ordinals(self) -> tuple:
+        """
+        The global ordinals of the first and last verses.
+        """
+        return (self._start, self._end)
+
+    def __len__(self) -> int:
+        return self._end - self._start + 1
+
+    def to_parts(self) -> tuple:
+        """
+        Return the (book, chapter, verse_start, verse_end) tuple for this passage, as parse_parts() would.
+        Raises ValueError if the passage spans chapters (except a whole book), which the tuple can't express.
+        """
+        book, c1, v1, c2, v2, whole = self._bounds()
+        if c1 == 1 and c2 == max_chapter(self._book) and whole:
+            return (book, None, None, None)
+        if c1 != c2:
+            raise ValueError(f'{self} spans chapters')
+        if whole:
+            return (book, c1, None, None)
+        return (book, c1, v1, v2 if v2 != v1 else None)
+
+    def __str__(self) -> str:
+        book, c1, v1, c2, v2, whole = self._bounds()
+        if c1 == c2 or (c1 == 1 and c2 == max_chapter(self._book) and whole):
+            return format_parts(self.to_parts())
+        if whole:
+            return f'{book} {c1}-{c2}'
+        return f'{book} {c1}:{v1}-{c2}:{v2}'
+
+    def _verses(self) -> str:
+        # The chapter and verses without the book, always with a colon so the chapter is unambiguous in a list ("12:1-2", "23:1-6").
+        _, c1, v1, c2, v2, _ = self._bounds()
+        if c1 != c2:
+            return f'{c1}:{v1}-{c2}:{v2}'
+        return f'{c1}:{v1}-{v2}' if v1 != v2 else f'{c1}:{v1}'
+
+    def __repr__(self) -> str:
+        return f'<Reference {self}>'
+
+    def _bounds(self) -> tuple:
+        # The book, first chapter and verse, last chapter and verse, and whether the passage is made of whole chapters.
+        _, c1, v1 = verse_location(self._start)
+        _, c2, v2 = verse_location(self._end)
+        return (self.book, c1, v1, c2, v2, v1 == 1 and v2 == verse_count(self._book, c2))
+
+    def __eq__(self, other):
+        if not isinstance(other, Reference):
+            return NotImplemented
+        return self._key == other._key
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+    # Ordered by first verse, then by last verse.
+    def __lt__(self, other):
+        if not isinstance(other, Reference):
+            return NotImplemented
+        return self._key < other._key
+
+    def __le__(self, other):
+        if not isinstance(other, Reference):
+            return NotImplemented
+        return self._key <= other._key
+
+    def __gt__(self, other):
+        if not isinstance(other, Reference):
+            return NotImplemented
+        return self._key > other._key
+
+    def __ge__(self, other):
+        if not isinstance(other, Reference):
+            return NotImplemented
+        return self._key >= other._key
+
+    def contains(self, other) -> bool:
+        """
+        Whether every verse of other is also in this passage.
+        """
+        return self._start <= other._start and other._end <= self._end
+
+    def overlaps(self, other) -> bool:
+        """
+        Whether this passage and other have any verses in common.
+        """
+        return self._start <= other._end and other._start <= self._end
+
+    def adjoins(self, other) -> bool:
+        """
+        Whether this passage and other are in the same book and overlap or are next to each other (eg. John 3:16 and John 3:17).
+        """
+        return self._book == other._book and self._start <= other._end + 1 and other._start <= self._end + 1
+
+    def merge(self, other):
+        """
+        Return the passage covering both this one and other.
+        Raises ValueError unless they adjoin (see adjoins()), as the result would include verses in neither.
+        """
+        if not self.adjoins(other):
+            raise ValueError(f"Can't merge {self} and {other}, which don't overlap or adjoin.")
+        return Reference._new(self._book, min(self._start, other._start), max(self._end, other._end))
+
+
+# A sort key that compares as a plain int (see __lt__), for sorting large lists without a Python call per comparison.
+Reference.sort_key = attrgetter('_key')
+
+
+def merge_references(references) -> list:
+    """
+    Return the given references sorted, with overlapping and adjoining passages in the same book merged.
+    """
+    merged = []
+    book = start = end = None
+    for reference in sorted(references, key=Reference.sort_key):
+        if reference._book == book and reference._start <= end + 1:
+            end = max(end, reference._end)
+            continue
+        if book is not None:
+            merged.append(Reference._new(book, start, end))
+        book, start, end = reference._book, reference._start, reference._end
+    if book is not None:
+        merged.append(Reference._new(book, start, end))
+    return merged
+
+
+# One item of an explicitly punctuated list: an optional book, then "C", "C:V", "C-C", "C:V-V", "C:V-C:V" or, after a verse, "V" or "V-V".
+_ITEM_RE = re.compile(r'((?:[1-3](?:st|nd|rd)?\s*)?[^\W\d_][^\d:;,]*?)?\s*(\d+)(?:\s*:\s*(\d+))?(?:\s*[-–]\s*(\d+)(?:\s*:\s*(\d+))?)?')
+_CROSS_CHAPTER_RE = re.compile(r':\s*\d+\s*[-–]\s*\d+\s*:')
+
+def parse_ranges(text:str) -> list:
+    """
+    Parse text into a list of References, in input order.
+    Handles lists and ranges across chapters, such as "Romans 8:28; 12:1-2", "John 3:16,18" and "John 3:16-4:2".
+    Items without a book use the previous item's. A number after a verse, up to the next semicolon, is another verse of the same chapter,
+    as is any number without a colon in a book with one chapter (eg. "Jude 3, 5" or "Jude 3-5").
+    A list needs at least one chapter:verse. Anything else is parsed as a single reference with parse_parts(), so dictated references
+    work as before (eg. "john 3;16" is John 3:16). Note that lists differ from parse_parts() where both apply: "John 3:16, 18" is
+    John 3:16 and John 3:18 here, but John 3:16-18 to parse_parts().
+    Raises ValueError if a passage doesn't exist.
+    """
+    references = _parse_list(text)
+    if references is None:
+        return [_parse_single(text)]
+    return list(references)
+
+def _parse_single(text:str):
+    book, chapter, verse_start, verse_end = parse_parts(text)
+    if verse_start is not None and verse_end is None and chapter != 1 and ':' not in text and book.lower() in BOOK_ORDINALS and max_chapter(book) == 1:
+        # Without a colon, both numbers are verses of the only chapter ("Jude 3-5"), as in a list. parse_parts() already reads "Jude 3" as Jude 1:3.
+        return Reference(book, 1, chapter, verse_start)
+    return Reference(book, chapter, verse_start, verse_end)
+
+def _parse_list(text:str):
+    # Return a tuple of the References of an explicitly punctuated list or cross-chapter range, or None if text isn't one.
+    # A colon is required, as dictation sometimes comes back with stray punctuation ("John 3, 16", "john 3;16").
+    # Most input fails this check without being digitized, so single references pay next to nothing for it.
+    if ':' not in text or not (';' in text or ',' in text or '-' in text or '–' in text):
+        return None
+    if instrument.hooks:
+        return instrument.timed('parse_list', _cached_list, text, _list_tags)
+    return _cached_list(text)
+
+def _cached_list(text:str):
+    return _cached_parse(text, _parse_list_items, 'list')
+
+def _list_tags(text:str, references) -> tuple:
+    return ('list',) if references is not None else ()
+
+def _parse_list_items(text:str):
+    text = digitize(text)
+    if not (';' in text or ',' in text or _CROSS_CHAPTER_RE.search(text)):
+        return None
+
+    references = []
+    book = chapter = None
+    verses = False
+    pieces = re.split(r'([;,])', text)
+    for i in range(0, len(pieces), 2):
+        item = pieces[i].strip()
+        if not item:
+            continue
+        m = _ITEM_RE.fullmatch(item)
+        if not m:
+            return None
+        name, start, verse, end, end_verse = m.groups()
+        if name:
+            book = format_book(name)
+            verses = False
+        elif book is None:
+            return None
+        elif pieces[i-1] == ';':
+            verses = False
+        if not verses and book.lower() in BOOK_ORDINALS and max_chapter(book) == 1:
+            # Books with one chapter are numbered by verse ("Jude 3").
+            chapter, verses = 1, True
+
+        start = int(start)
+        if verse is not None:
+            chapter, verse, verses = start, int(verse), True
+        elif verses:
+            verse = start
+        else:
+            chapter = start
+
+        if end is None:
+            references.append(Reference(book, chapter, verse))
+        elif end_verse is not None:
+            references.append(Reference(book, chapter, verse or 1, int(end_verse), chapter_end=int(end)))
+            chapter, verses = int(end), True
+        elif verse is not None:
+            references.append(Reference(book, chapter, verse, int(end)))
+        else:
+            references.append(Reference(book, chapter, chapter_end=int(end)))
+    return tuple(references) or None
+
+def format_ranges(references) -> list:
+    """
+    Format references as passage queries, one for each run of references in the same book, eg. ["Romans 8:28,12:1-2"].
+    This is the form bible-api (and LocalBible) accept for several passages in one request.
+    Verses are always given with their chapter, even alone (eg. "Psalms 24:1-25:10" for Psalms 24-25), so each query reads as a list.
+    """
+    queries = []
+    for _, group in groupby(references, key=attrgetter('_book')):
+        group = list(group)
+        queries.append(f'{group[0].book} ' + ','.join(r._verses() for r in group))
+    return queries
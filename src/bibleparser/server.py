@@ -0,0 +1,317 @@
+"""
+A long-running parse server, so that callers making one request at a time don't pay for imports, index builds and
+upstream connections on every call.
+
+    python -m bibleparser serve --port 8080
+    python -m bibleparser serve --unix /tmp/bibleparser.sock
+
+Endpoints (all JSON):
+    GET  /parse?q=john+three+sixteen     {"input": ..., "parsed": "John 3:16"}, or 400 with {"input": ..., "error": ...}
+    POST /parse {"references": [...]}    {"results": [...]}, one of the above objects per reference
+    GET  /passage?q=john+3+16            fetch_passage()'s result, or an error status with {"input": ..., "error": ...}
+    GET  /health                         {"status": "ok", ...}, or 503 while shutting down
+    GET  /metrics                        per-stage timings in Prometheus' text format, if the server was given a MetricsAggregator
+
+Parse requests that arrive together are parsed as one batch, after at most batch_window seconds (or once max_batch are waiting).
+Identical inputs in a batch are only parsed once, and with workers, batches are parsed in worker processes so the event loop
+stays free for I/O.
+"""
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from ._asynchttp import BodyTooLarge, HTTPProtocolError, format_response, read_request, wants_keep_alive
+from .batch import _parse_chunk, _resolve
+from .bibleparser import enable_cache, parse_reference
+from .client import PassageFetchError
+from .passages import fetch_passage_async, get_default_backend
+
+
+# Inputs that build the lazily-loaded tables (number words, the fuzzy book index) before the first request needs them.
+_WARM_INPUTS = ["john three sixteen", "Michael 1 1", "hey guy 223"]
+
+_log = logging.getLogger(__name__)
+
+# The most references a POST to /parse may ask for, and the largest request body accepted, in bytes.
+MAX_REFERENCES = 1000
+MAX_BODY = 256 * 1024
+
+
+def warm(cache_size:int=0):
+    """
+    Build the parser's lazily-loaded tables now and, if cache_size is set, enable a parse cache of that size.
+    Also the initializer for worker processes.
+    """
+    if cache_size:
+        enable_cache(cache_size)
+    for text in _WARM_INPUTS:
+        parse_reference(text)
+
+
+class ParseBatcher:
+    """
+    Collects parse requests and parses them in batches. parse() returns a future for parse_reference()'s result, or the exception it raised.
+    A batch is parsed batch_window seconds after its first request, or as soon as max_batch requests are waiting.
+    With an executor (eg. a ProcessPoolExecutor), batches are parsed there instead of on the event loop.
+    """
+    def __init__(self, batch_window:float=0.0, max_batch:int=256, executor=None):
+        if max_batch < 1:
+            raise ValueError(f'max_batch must be at least 1: {max_batch!r}')
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.executor = executor
+        self.batches = 0
+        self.parsed = 0
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    def parse(self, text:str):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_window, self.flush)
+        return future
+
+    def flush(self):
+        """
+        Start parsing the waiting requests now.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        texts = [text for text, _ in batch]
+        if self.executor is None:
+            self.parsed += len(set(texts))
+            _deliver(batch, _resolve(texts, _parse_chunk))
+            return
+        task = asyncio.get_running_loop().create_task(self._parse_in_executor(batch, texts))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _parse_in_executor(self, batch:list, texts:list):
+        unique = list(dict.fromkeys(texts))
+        self.parsed += len(unique)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, _parse_chunk, unique)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        results = dict(zip(unique, results))
+        _deliver(batch, [results[text] for text in texts])
+
+def _deliver(batch:list, results:list):
+    for (_, future), result in zip(batch, results):
+        if not future.done():
+            future.set_result(result)
+
+
+class ParseServer:
+    """
+    Serves the parse and passage endpoints (see the module docstring) over TCP at host:port, or over a Unix socket at path.
+    backend defaults to the default passage backend, whose pooled connections then stay open between requests.
+    On stop(), the server stops accepting connections and closes idle ones, then gives requests in progress up to grace seconds to finish.
+    Requests with a body longer than max_body bytes are answered with 413 (without reading the body) and the connection is closed.
+    """
+    def __init__(self, host:str='127.0.0.1', port:int=8080, path:str=None, backend=None, batcher:ParseBatcher=None, metrics=None, grace:float=10.0, max_body:int=MAX_BODY):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.backend = backend
+        self.batcher = batcher or ParseBatcher()
+        self.metrics = metrics
+        self.grace = grace
+        self.max_body = max_body
+        self.requests = 0
+        self._server = None
+        self._started = None
+        self._closing = False
+        self._handlers = set()
+        self._idle = set()
+
+    @property
+    def address(self) -> str:
+        """
+        Where the server is listening: "http://host:port" or "unix:path".
+        """
+        if self.path:
+            return f'unix:{self.path}'
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f'http://{host}:{port}'
+
+    async def start(self):
+        if self.path:
+            self._server = await asyncio.start_unix_server(self._handle, self.path)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self._started = time.monotonic()
+        return self
+
+    async def stop(self):
+        self._closing = True
+        self._server.close()
+        # Connections waiting for their next request are closed now. The others close once they've sent their response.
+        for writer in list(self._idle):
+            writer.close()
+        self.batcher.flush()
+        if self._handlers:
+            _, pending = await asyncio.wait(list(self._handlers), timeout=self.grace)
+            for task in pending:
+                task.cancel()
+        await self._server.wait_closed()
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def serve_until(self, stop:asyncio.Event):
+        """
+        Serve (starting the server first if need be) until stop is set, then shut down as stop() does.
+        """
+        if self._server is None:
+            await self.start()
+        try:
+            await stop.wait()
+        finally:
+            await self.stop()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while not self._closing:
+                self._idle.add(writer)
+                try:
+                    request = await read_request(reader, self.max_body)
+                except BodyTooLarge as e:
+                    writer.write(format_response(413, json.dumps({'error': str(e)}).encode('utf-8'), keep_alive=False))
+                    await writer.drain()
+                    break
+                finally:
+                    self._idle.discard(writer)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                self.requests += 1
+                try:
+                    status, content_type, data = await self._respond(method, target, body)
+                except Exception:
+                    # Eg. a backend failing in an unexpected way. Keep-alive clients still get an answer.
+                    _log.exception('Error handling %s %s', method, target)
+                    status, content_type, data = 500, 'application/json', b'{"error": "Internal server error."}'
+                keep_alive = wants_keep_alive(headers) and not self._closing
+                writer.write(format_response(status, data, content_type, keep_alive=keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (HTTPProtocolError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            self._handlers.discard(task)
+
+    async def _respond(self, method:str, target:str, body:bytes) -> tuple:
+        # Returns (status, content type, body).
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        route = (method, url.path.rstrip('/') or '/')
+
+        if route == ('GET', '/parse'):
+            status, data = await self._parse(query.get('q', [''])[0])
+        elif route == ('POST', '/parse'):
+            status, data = await self._parse_many(body)
+        elif route == ('GET', '/passage'):
+            status, data = await self._passage(query.get('q', [''])[0])
+        elif route == ('GET', '/health'):
+            status, data = self._health()
+        elif route == ('GET', '/metrics') and self.metrics is not None:
+            return (200, 'text/plain; version=0.0.4', self.metrics.prometheus().encode('utf-8'))
+        elif url.path.rstrip('/') in ('/parse', '/passage', '/health') or (url.path.rstrip('/') == '/metrics' and self.metrics is not None):
+            status, data = 405, {'error': f'{method} is not allowed here.'}
+        else:
+            status, data = 404, {'error': 'not found'}
+        return (status, 'application/json', json.dumps(data).encode('utf-8'))
+
+    async def _parse(self, text:str) -> tuple:
+        result = await self.batcher.parse(text)
+        if isinstance(result, Exception):
+            return (400, {'input': text, 'error': str(result)})
+        return (200, {'input': text, 'parsed': result})
+
+    async def _parse_many(self, body:bytes) -> tuple:
+        try:
+            texts = json.loads(body)['references']
+        except (ValueError, TypeError, KeyError):
+            texts = None
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return (400, {'error': 'Expected a JSON object with a "references" list of strings.'})
+        if len(texts) > MAX_REFERENCES:
+            return (413, {'error': f'At most {MAX_REFERENCES} references per request.'})
+        results = await asyncio.gather(*(self._parse(text) for text in texts))
+        return (200, {'results': [data for _, data in results]})
+
+    async def _passage(self, text:str) -> tuple:
+        try:
+            data = await fetch_passage_async(text, self.backend or get_default_backend())
+        except ValueError as e:
+            return (400, {'input': text, 'error': str(e)})
+        except PassageFetchError as e:
+            return (e.status if e.status < 500 else 502, {'input': text, 'error': str(e)})
+        except (OSError, asyncio.TimeoutError) as e:
+            return (502, {'input': text, 'error': f'Upstream request failed: {e!r}'})
+        if data is None:
+            return (400, {'input': text, 'error': 'Could not parse a reference.'})
+        return (200, data)
+
+    def _health(self) -> tuple:
+        if self._closing:
+            return (503, {'status': 'shutting down'})
+        return (200, {
+            'status': 'ok',
+            'uptime': round(time.monotonic() - self._started, 3),
+            'requests': self.requests,
+            'batches': self.batcher.batches,
+            'parsed': self.batcher.parsed,
+        })
+
+
+async def serve(server:ParseServer, signals=(signal.SIGINT, signal.SIGTERM)):
+    """
+    Run server until one of signals is received, then shut it down gracefully.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in signals:
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            # Not supported on Windows' event loops. Ctrl-C still stops the server, just not gracefully.
+            pass
+    try:
+        await server.serve_until(stop)
+    finally:
+        for sig in signals:
+            try:
+                loop.remove_signal_handler(sig)
+            except (NotImplementedError, RuntimeError):
+                pass
@@ -0,0 +1,75 @@
+"""
+Request coalescing: concurrent calls for the same key share a single execution.
+"""
+from threading import Event, Lock
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = Event()
+        self.result = self.error = None
+
+
+class SingleFlight:
+    """
+    While a call for a key is in flight, other callers with the same key wait for it and get its result (or its exception)
+    instead of starting their own. coalesced counts the callers that did so.
+    Threads and asyncio tasks are coalesced separately: threads with threads, and tasks with tasks on the same event loop.
+    """
+    def __init__(self):
+        self.coalesced = 0
+        self._lock = Lock()
+        self._calls = {}
+        self._tasks = {}
+
+    def do(self, key, fn):
+        """
+        Return fn(), or the result of an identical call already in flight in another thread.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, fn):
+        """
+        Return await fn(), or the result of an identical call already in flight on this event loop.
+        The call runs in its own task, so cancelling one caller doesn't cancel it for the others.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        flight = (loop, key)
+        with self._lock:
+            task = self._tasks.get(flight)
+            if task is not None:
+                self.coalesced += 1
+            else:
+                task = self._tasks[flight] = loop.create_task(fn())
+                task.add_done_callback(lambda _: self._forget(flight))
+        return await asyncio.shield(task)
+
+    def _forget(self, flight):
+        with self._lock:
+            self._tasks.pop(flight, None)
@@ -0,0 +1,185 @@
+"""
+Local stand-ins for bible-api, for tests and benchmarks.
+
+    with StubServer(latency=0.01) as stub:
+        client = PassageClient(stub.url)
+        client.fetch("John 3:16")  # {"reference": "John 3:16", "text": "Text of John 3:16.\n", ...}
+
+    async with AsyncStubServer(latency=0.01) as stub:
+        await PassageClient(stub.url).fetch_async("John 3:16")
+"""
+import asyncio
+import json
+import socket
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import unquote
+
+from ._asynchttp import HTTPProtocolError, format_response, read_request, wants_keep_alive
+
+
+def stub_passage(reference:str) -> dict:
+    """
+    The response the stub servers give for a passage.
+    """
+    return {
+        'reference': reference,
+        'verses': [],
+        'text': f'Text of {reference}.\n',
+        'translation_id': 'stub',
+    }
+
+
+class StubServer:
+    """
+    A threaded HTTP/1.1 server on localhost that answers GET /<passage> with stub_passage().
+    Each request waits latency seconds before responding.
+    Statuses pushed onto failures are returned (in order) instead of a passage by the next requests.
+    """
+    def __init__(self, latency:float=0.0):
+        self.latency = latency
+        self.failures = []
+        self.hits = 0
+        self.connections = 0
+        self._lock = Lock()
+        self._server = _QuietServer(('127.0.0.1', 0), _handler(self))
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _respond(self, path:str) -> tuple:
+        with self._lock:
+            self.hits += 1
+            failure = self.failures.pop(0) if self.failures else None
+        if self.latency:
+            time.sleep(self.latency)
+        if failure:
+            return (failure, {'error': 'stub failure'})
+        reference = unquote(path.lstrip('/'))
+        if not reference:
+            return (404, {'error': 'not found'})
+        return (200, stub_passage(reference))
+
+
+class AsyncStubServer:
+    """
+    The asyncio counterpart of StubServer, running on the current event loop.
+    Latency is injected with asyncio.sleep, so concurrent requests overlap. max_in_flight records the most requests handled at once.
+    """
+    def __init__(self, latency:float=0.0):
+        self.latency = latency
+        self.failures = []
+        self.hits = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f'http://{host}:{port}'
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                _, target, headers, _ = request
+                status, data = await self._respond(target)
+                keep_alive = wants_keep_alive(headers)
+                writer.write(format_response(status, json.dumps(data).encode('utf-8'), keep_alive=keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (HTTPProtocolError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, path:str) -> tuple:
+        self.hits += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            failure = self.failures.pop(0) if self.failures else None
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if failure:
+            return (failure, {'error': 'stub failure'})
+        reference = unquote(path.lstrip('/'))
+        if not reference:
+            return (404, {'error': 'not found'})
+        return (200, stub_passage(reference))
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that time out hang up mid-response. That's expected here.
+        pass
+
+
+def _handler(stub:StubServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            # Headers and body are written separately, so don't let Nagle's algorithm hold back the body.
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with stub._lock:
+                stub.connections += 1
+
+        def do_GET(self):
+            status, data = stub._respond(self.path)
+            body = json.dumps(data).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
@@ -0,0 +1,84 @@
+import asyncio
+import time
+import unittest
+
+import sys
+sys.path.append("..")
+
+from bibleparser.bibleparser import fetch_passage_async, fetch_passages_async
+from bibleparser.client import PassageClient, PassageFetchError
+from bibleparser.testing import AsyncStubServer
+
+
+class TestAsyncFetch(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.stub = await AsyncStubServer().start()
+        self.client = PassageClient(self.stub.url, backoff=0)
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        await self.stub.stop()
+
+    async def test_fetch_async(self):
+        data = await self.client.fetch_async("John 3:16")
+        self.assertEqual(data['reference'], "John 3:16")
+        self.assertEqual(data['text'], "Text of John 3:16.\n")
+
+    async def test_connection_reuse(self):
+        for _ in range(5):
+            await self.client.fetch_async("John 3:16")
+        self.assertEqual(self.stub.hits, 5)
+        self.assertEqual(self.stub.connections, 1)
+
+    async def test_retries(self):
+        self.stub.failures = [503, 429]
+        self.assertEqual((await self.client.fetch_async("John 3:16"))['reference'], "John 3:16")
+        self.assertEqual(self.stub.hits, 3)
+
+    async def test_read_timeout(self):
+        self.stub.latency = 0.5
+        client = PassageClient(self.stub.url, read_timeout=0.05, retries=0)
+        with self.assertRaises(asyncio.TimeoutError):
+            await client.fetch_async("John 3:16")
+
+    async def test_fetch_passage_async(self):
+        result = await fetch_passage_async("john three sixteen", self.client)
+        self.assertEqual(result, {
+            'input': "john three sixteen",
+            'parsed': "John 3:16",
+            'reference': "John 3:16",
+            'text': "Text of John 3:16.\n",
+        })
+
+    async def test_fetch_list_async(self):
+        result = await fetch_passage_async("John 3:16-4:2; Romans 8:28", self.client)
+        self.assertEqual(result['parsed'], "John 3:16-4:2; Romans 8:28")
+        self.assertEqual(result['text'], "Text of John 3:16-4:2.\nText of Romans 8:28.\n")
+        self.assertEqual(self.stub.hits, 2)
+
+    async def test_results_in_order_with_errors(self):
+        self.stub.failures = [404]
+        texts = ["Hezekiah 1:1", "John 3:16", "?!", "Hey guy 223"]
+        results = await fetch_passages_async(texts, concurrency=1, backend=self.client)
+        self.assertIsInstance(results[0], PassageFetchError)
+        self.assertEqual(results[1]['parsed'], "John 3:16")
+        self.assertIsInstance(results[2], ValueError)
+        self.assertEqual(results[3]['parsed'], "Haggai 2:23")
+
+    async def test_concurrency_limit(self):
+        self.stub.latency = 0.05
+        texts = [f"Psalm {n}" for n in range(1, 13)]
+        start = time.perf_counter()
+        results = await fetch_passages_async(texts, concurrency=4, backend=self.client)
+        elapsed = time.perf_counter() - start
+        self.assertEqual([r['parsed'] for r in results], [f"Psalms {n}" for n in range(1, 13)])
+        self.assertEqual(self.stub.max_in_flight, 4)
+        self.assertLess(elapsed, 12 * 0.05)
+
+    async def test_invalid_concurrency(self):
+        with self.assertRaises(ValueError):
+            await fetch_passages_async(["John 3:16"], concurrency=0, backend=self.client)
+
+
+if __name__ == '__main__':
+    unittest.main()
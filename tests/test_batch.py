@@ -0,0 +1,61 @@
+import unittest
+
+import sys
+sys.path.append("..")
+
+from bibleparser.batch import parse_references
+from bibleparser.bibleparser import parse_reference
+
+
+TEXTS = [
+    "John 3:16", "john three sixteen", "Hey guy 223", "", "matthew 2112 to 13",
+    "John 3:16", "?!", "X126", "psalm forty-two", "won timothy for ate",
+] * 7
+
+
+def expected(text):
+    try:
+        return parse_reference(text)
+    except Exception as e:
+        return e
+
+
+class TestParseReferences(unittest.TestCase):
+    def assertMatchesSingle(self, results):
+        self.assertEqual(len(results), len(TEXTS))
+        for text, result in zip(TEXTS, results):
+            single = expected(text)
+            if isinstance(single, Exception):
+                self.assertIs(type(result), type(single), text)
+                self.assertEqual(result.args, single.args, text)
+            else:
+                self.assertEqual(result, single, text)
+
+    def test_serial(self):
+        self.assertMatchesSingle(list(parse_references(TEXTS, chunksize=4)))
+
+    def test_workers(self):
+        self.assertMatchesSingle(list(parse_references(iter(TEXTS), workers=2, chunksize=3)))
+
+    def test_is_lazy(self):
+        results = parse_references(iter(TEXTS), chunksize=2)
+        self.assertEqual(next(results), "John 3:16")
+
+    def test_early_close(self):
+        results = parse_references(TEXTS, workers=2, chunksize=2)
+        self.assertEqual(next(results), "John 3:16")
+        results.close()
+
+    def test_empty(self):
+        self.assertEqual(list(parse_references([])), [])
+        self.assertEqual(list(parse_references([], workers=2)), [])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            list(parse_references(TEXTS, chunksize=0))
+        with self.assertRaises(ValueError):
+            list(parse_references(TEXTS, workers=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
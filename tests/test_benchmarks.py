@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import sys
+sys.path.append("..")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import bibleparser.bibleparser as bp
+from bibleparser.bibleparser import parse_reference
+from bibleparser.instrument import MetricsAggregator, add_hook, remove_hook
+from benchmarks import corpus
+from benchmarks import run as harness
+
+
+BASELINE = {
+    'parse_reference': {'ops_per_sec': 1000.0, 'p50_us': 10.0, 'p99_us': 50.0},
+    'fetch_passage': {'ops_per_sec': 100.0, 'p50_us': 400.0, 'p99_us': 900.0},
+}
+
+
+class TestCompare(unittest.TestCase):
+    def test_within_threshold(self):
+        results = {
+            'parse_reference': {'ops_per_sec': 950.0, 'p50_us': 10.5, 'p99_us': 500.0},
+            'fetch_passage': {'ops_per_sec': 120.0, 'p50_us': 300.0, 'p99_us': 900.0},
+        }
+        # p99 isn't checked.
+        self.assertEqual(harness.compare(BASELINE, results, 0.1), [])
+
+    def test_regressions(self):
+        results = {
+            'parse_reference': {'ops_per_sec': 800.0, 'p50_us': 12.0, 'p99_us': 50.0},
+            'fetch_passage': {'ops_per_sec': 100.0, 'p50_us': 400.0, 'p99_us': 900.0},
+        }
+        self.assertEqual(harness.compare(BASELINE, results, 0.1), ['parse_reference ops_per_sec: 1000 -> 800 (-20.0%)'])
+        self.assertEqual(harness.compare(BASELINE, results, 0.1, metrics=('ops_per_sec', 'p50_us')), [
+            'parse_reference ops_per_sec: 1000 -> 800 (-20.0%)',
+            'parse_reference p50_us: 10 -> 12 (+20.0%)',
+        ])
+        self.assertEqual(harness.compare(BASELINE, results, 0.25, metrics=('ops_per_sec', 'p50_us')), [])
+
+    def test_calibration(self):
+        # The whole machine ran 20% slower, so 20% fewer ops/sec isn't a regression, but 40% fewer is.
+        baseline = dict(BASELINE, calibration={'ops_per_sec': 500.0, 'p50_us': 2.0, 'p99_us': 3.0})
+        slower = {'calibration': {'ops_per_sec': 400.0, 'p50_us': 2.5, 'p99_us': 3.0}}
+        results = dict(slower, parse_reference={'ops_per_sec': 800.0, 'p50_us': 12.5, 'p99_us': 50.0})
+        self.assertEqual(harness.compare(baseline, results, 0.1, metrics=('ops_per_sec', 'p50_us')), [])
+        results = dict(slower, parse_reference={'ops_per_sec': 600.0, 'p50_us': 12.5, 'p99_us': 50.0})
+        self.assertEqual(harness.compare(baseline, results, 0.1), ['parse_reference ops_per_sec: 800 -> 600 (-25.0%)'])
+        # A faster machine doesn't raise the bar.
+        faster = {'calibration': {'ops_per_sec': 600.0, 'p50_us': 1.5, 'p99_us': 3.0}}
+        results = dict(faster, parse_reference={'ops_per_sec': 1000.0, 'p50_us': 10.0, 'p99_us': 50.0})
+        self.assertEqual(harness.compare(baseline, results, 0.1), [])
+
+    def test_stage_thresholds(self):
+        results = {'fetch_passage': {'ops_per_sec': 80.0, 'p50_us': 400.0, 'p99_us': 900.0}}
+        self.assertEqual(len(harness.compare(BASELINE, results, 0.1)), 1)
+        self.assertEqual(harness.compare(BASELINE, results, 0.1, {'fetch_passage': 0.3}), [])
+
+    def test_new_and_missing_stages(self):
+        results = {'new_stage': {'ops_per_sec': 1.0, 'p50_us': 1.0, 'p99_us': 1.0}}
+        self.assertEqual(harness.compare(BASELINE, results, 0.1), [])
+
+    def test_exit_status(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'baseline.json')
+            with open(path, 'w') as f:
+                json.dump({'results': BASELINE}, f)
+            slow = {'parse_reference': {'ops_per_sec': 500.0, 'p50_us': 10.0, 'p99_us': 50.0}}
+            with mock.patch.object(harness, 'run', return_value=slow), mock.patch('sys.stdout'), mock.patch('sys.stderr'):
+                self.assertEqual(harness.main(['--compare', path]), 1)
+                self.assertEqual(harness.main(['--compare', path, '--threshold', '0.6']), 0)
+                self.assertEqual(harness.main(['--compare', path, '--stage-threshold', 'parse_reference=0.6']), 0)
+
+
+class TestStageInputs(unittest.TestCase):
+    def test_matches_instrumentation(self):
+        # The harness times the same stages the instrumentation hooks report.
+        metrics = add_hook(MetricsAggregator())
+        try:
+            parse_reference("john 3 16")
+        finally:
+            remove_hook(metrics)
+        split_words = bp._split_words
+        recorded = harness.stage_inputs(["john 3 16"])
+        self.assertEqual(set(recorded), set(metrics.snapshot()) - {'parse'})
+        self.assertEqual(recorded['filter'], ["john 3 16"])
+        self.assertIs(bp._split_words, split_words)
+
+
+class TestCorpus(unittest.TestCase):
+    def test_deterministic(self):
+        self.assertEqual(corpus.corpus(200, seed=3), corpus.corpus(200, seed=3))
+        self.assertEqual({kind for kind, _ in corpus.corpus(200)}, {'clean', 'words', 'siri', 'garbage'})
+
+    def test_words(self):
+        self.assertEqual([corpus.words(n) for n in (7, 13, 40, 42, 119)], ['seven', 'thirteen', 'forty', 'forty-two', '119'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@ import unittest
 import sys
 sys.path.append("..")
 
-from bibleparser.bibleparser import parse_reference
+from bibleparser.bibleparser import parse_reference, digitize
 
 
 class TestParseReference(unittest.TestCase):
@@ -68,6 +68,11 @@ class TestParseReference(unittest.TestCase):
         self.assertEqual(parse_reference("\"mark, 1, 1\""), "Mark 1:1")
         self.assertEqual(parse_reference("'mark, 1, 1'"), "Mark 1:1")
 
+    def test_unparseable(self):
+        for text in ["", "   ", "?!", "the verse"]:
+            with self.assertRaises(ValueError):
+                parse_reference(text)
+
     def test_missing_verse(self):
         self.assertEqual(parse_reference("John 3:"), "John 3")
         self.assertEqual(parse_reference("John chapter 3 verses"), "John 3")
@@ -96,6 +101,11 @@ class TestParseReference(unittest.TestCase):
         self.assertEqual(parse_reference("psalms 3820"), "Psalms 38:20") # "psalms thirty eight twenty"
         self.assertEqual(parse_reference("psalms 3820 through 22"), "Psalms 38:20-22") # "psalms thirty eight twenty through twenty two"
         self.assertEqual(parse_reference("song of solomon 45"), "Song Of Solomon 4:5")
+        # Books with one chapter are cited by verse.
+        self.assertEqual(parse_reference("jude 3"), "Jude 1:3")
+        self.assertEqual(parse_reference("philemon 12"), "Philemon 1:12")
+        self.assertEqual(parse_reference("jude 125"), "Jude 1:25") # "jude one twenty five"
+        self.assertEqual(parse_reference("jude 1"), "Jude 1")
         # self.assertEqual(parse_reference("Psalms 156"), "Psalms 150:6") #."psalms one fifty six" doesn't work with current implementation
 
     def test_canonicalization(self):
@@ -121,5 +131,29 @@ class TestParseReference(unittest.TestCase):
         self.assertEqual(parse_reference("Michael 1 1"), "Micah 1:1")
 
 
+class TestDigitize(unittest.TestCase):
+    def test_single_numbers(self):
+        self.assertEqual(digitize("john three sixteen"), "john 3 16")
+        self.assertEqual(digitize("Psalm Nineteen"), "Psalm 19")
+        self.assertEqual(digitize("SIXTY six"), "60 6")
+
+    def test_homophones(self):
+        self.assertEqual(digitize("won timothy for ate"), "1 timothy 4 8")
+        self.assertEqual(digitize("matthew 12 went through sicks"), "matthew 12 1 through 6")
+        self.assertEqual(digitize("genesis 1 1 to 3"), "genesis 1 1 to 3")
+
+    def test_composite_numbers(self):
+        self.assertEqual(digitize("forty-two"), "42")
+        self.assertEqual(digitize("Fourty-Won"), "41")
+        self.assertEqual(digitize("ninety-nine nine"), "99 9")
+        self.assertEqual(digitize("forty two"), "40 2")
+        self.assertEqual(digitize("twenty-one-two"), "21-2")
+
+    def test_word_boundaries(self):
+        self.assertEqual(digitize("someone tone eighteenth"), "someone tone eighteenth")
+        self.assertEqual(digitize("forty-twofold"), "40-twofold")
+        self.assertEqual(digitize("(seven),eight"), "(7),8")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+
+import sys
+sys.path.append("..")
+
+from bibleparser import bibleparser
+from bibleparser.bibleparser import parse_reference, parse_parts, enable_cache, disable_cache, cache_info, cache_clear
+from bibleparser.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction_order(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1) # "b" is now least recently used
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.info(), (3, 1, 1, 2, 2))
+
+    def test_clear(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.get('a')
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.info(), (0, 0, 0, 2, 0))
+
+    def test_invalid_maxsize(self):
+        with self.assertRaises(ValueError):
+            LRUCache(0)
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        enable_cache(maxsize=3)
+
+    def tearDown(self):
+        disable_cache()
+
+    def test_disabled_by_default(self):
+        disable_cache()
+        self.assertIsNone(cache_info())
+        self.assertEqual(parse_reference("john 3 16"), "John 3:16")
+
+    def test_hits_and_misses(self):
+        self.assertEqual(parse_reference("john 3 16"), "John 3:16")
+        self.assertEqual(parse_reference("  john   3 16 "), "John 3:16")
+        self.assertEqual(parse_reference("john 3 16"), "John 3:16")
+        info = cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 1, 1))
+
+    def test_case_is_significant(self):
+        # Filler words are matched case-sensitively, so differently cased inputs are cached separately.
+        self.assertEqual(parse_reference("JOHN chapter 3 verse 16"), "John 3:16")
+        self.assertEqual(parse_reference("john chapter 3 verse 16"), "John 3:16")
+        self.assertEqual(cache_info().currsize, 2)
+
+    def test_results_match_uncached(self):
+        texts = ["matthew 2112 to 13", "won timothy for ate", "Hey guy 223", "X126", "psalm forty-two"]
+        cached = [parse_parts(t) for t in texts + texts]
+        disable_cache()
+        self.assertEqual(cached, [parse_parts(t) for t in texts + texts])
+
+    def test_evictions(self):
+        for text in ["john 1", "john 2", "john 3", "john 4"]:
+            parse_reference(text)
+        info = cache_info()
+        self.assertEqual((info.evictions, info.currsize, info.maxsize), (1, 3, 3))
+
+    def test_errors_are_cached(self):
+        calls = []
+        original = bibleparser._parse_parts
+        def counting(text):
+            calls.append(text)
+            return original(text)
+        bibleparser._parse_parts = counting
+        try:
+            for _ in range(3):
+                with self.assertRaises(ValueError):
+                    parse_reference(" ?! ")
+        finally:
+            bibleparser._parse_parts = original
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache_info().hits, 2)
+
+    def test_clear(self):
+        parse_reference("john 3 16")
+        cache_clear()
+        self.assertEqual(cache_info().currsize, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
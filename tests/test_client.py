@@ -0,0 +1,122 @@
+import socket
+import unittest
+
+import sys
+sys.path.append("..")
+
+from bibleparser.bibleparser import fetch_passage, get_passage, get_default_backend, set_default_backend
+from bibleparser.client import PassageClient, PassageFetchError
+from bibleparser.testing import StubServer
+
+
+class TestPassageClient(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubServer().start()
+        self.client = PassageClient(self.stub.url, backoff=0)
+
+    def tearDown(self):
+        self.client.close()
+        self.stub.stop()
+
+    def test_fetch(self):
+        data = self.client.fetch("John 3:16")
+        self.assertEqual(data['reference'], "John 3:16")
+        self.assertEqual(data['text'], "Text of John 3:16.\n")
+
+    def test_connection_reuse(self):
+        for _ in range(5):
+            self.client.fetch("John 3:16")
+        self.assertEqual(self.stub.hits, 5)
+        self.assertEqual(self.stub.connections, 1)
+
+    def test_without_connection_reuse(self):
+        client = PassageClient(self.stub.url, max_connections=0)
+        self.addCleanup(client.close)
+        for _ in range(5):
+            client.fetch("John 3:16")
+        self.assertEqual(self.stub.connections, 5)
+
+    def test_reconnects_after_close(self):
+        self.client.fetch("John 3:16")
+        self.client.close()
+        self.client.fetch("John 3:16")
+        self.assertEqual(self.stub.connections, 2)
+
+    def test_base_url_path(self):
+        client = PassageClient(self.stub.url + '/api/')
+        self.addCleanup(client.close)
+        self.assertEqual(client.fetch("John 3:16")['reference'], "api/John 3:16")
+
+    def test_retries_server_errors(self):
+        self.stub.failures = [503, 429]
+        self.assertEqual(self.client.fetch("John 3:16")['reference'], "John 3:16")
+        self.assertEqual(self.stub.hits, 3)
+
+    def test_gives_up_after_retries(self):
+        self.stub.failures = [500, 502, 503, 504]
+        with self.assertRaises(PassageFetchError) as cm:
+            self.client.fetch("John 3:16")
+        self.assertEqual(cm.exception.status, 503)
+        self.assertEqual(self.stub.hits, 3)
+
+    def test_client_errors_are_not_retried(self):
+        self.stub.failures = [404]
+        with self.assertRaises(PassageFetchError) as cm:
+            self.client.fetch("Hezekiah 1:1")
+        self.assertEqual(cm.exception.status, 404)
+        self.assertEqual(self.stub.hits, 1)
+
+    def test_read_timeout(self):
+        self.stub.latency = 0.5
+        client = PassageClient(self.stub.url, read_timeout=0.05, retries=0)
+        self.addCleanup(client.close)
+        with self.assertRaises(socket.timeout):
+            client.fetch("John 3:16")
+
+    def test_invalid_base_url(self):
+        with self.assertRaises(ValueError):
+            PassageClient("ftp://example.com")
+
+
+class TestFetchPassage(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubServer().start()
+
+    def tearDown(self):
+        set_default_backend(None)
+        self.stub.stop()
+
+    def test_backend_argument(self):
+        with PassageClient(self.stub.url) as client:
+            self.assertEqual(fetch_passage("john three sixteen", client), {
+                'input': "john three sixteen",
+                'parsed': "John 3:16",
+                'reference': "John 3:16",
+                'text': "Text of John 3:16.\n",
+            })
+
+    def test_list_in_one_request(self):
+        with PassageClient(self.stub.url) as client:
+            result = fetch_passage("Romans 8:28; 12:1-2", client)
+        self.assertEqual(result['parsed'], "Romans 8:28,12:1-2")
+        self.assertEqual(result['text'], "Text of Romans 8:28,12:1-2.\n")
+        self.assertEqual(self.stub.hits, 1)
+
+    def test_list_across_books(self):
+        # One request per book.
+        with PassageClient(self.stub.url) as client:
+            result = fetch_passage("John 3:16; Romans 8:28, 31", client)
+        self.assertEqual(result['parsed'], "John 3:16; Romans 8:28,8:31")
+        self.assertEqual(result['text'], "Text of John 3:16.\nText of Romans 8:28,8:31.\n")
+        self.assertEqual(self.stub.hits, 2)
+
+    def test_default_backend(self):
+        client = PassageClient(self.stub.url)
+        self.addCleanup(client.close)
+        set_default_backend(client)
+        self.assertEqual(get_passage("Hey guy 223"), "Text of Haggai 2:23.\n")
+        self.assertEqual(get_default_backend().base_url, self.stub.url)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import io
+import unittest
+
+import sys
+sys.path.append("..")
+
+from bibleparser.extract import ReferenceSpan, iter_references
+
+
+TRANSCRIPT = (
+    "Last week we read John 3:16-17 and 1 Corinthians 13. Today turn to Romans 8:28; also psalm forty-two "
+    "and first john chapter 2 verse 3.\nMark my words: Mark 2 matters. In 2024 there were 12 of us. "
+    "Song of Songs 2:4, Jude 30, Hebrews 11.1–6, the second John 3:16 and Matthew 2112."
+)
+
+
+def found(source, **kwargs):
+    return [(span.text, span.parts) for span in iter_references(source, **kwargs)]
+
+
+class TestIterReferences(unittest.TestCase):
+    def test_references(self):
+        self.assertEqual(found(TRANSCRIPT), [
+            ("John 3:16-17", ("John", 3, 16, 17)),
+            ("1 Corinthians 13", ("1 Corinthians", 13, None, None)),
+            ("Romans 8:28", ("Romans", 8, 28, None)),
+            ("psalm forty-two", ("Psalms", 42, None, None)),
+            ("first john chapter 2 verse 3", ("1 John", 2, 3, None)),
+            ("Mark 2", ("Mark", 2, None, None)),
+            ("Song of Songs 2:4", ("Song Of Solomon", 2, 4, None)),
+            ("Hebrews 11.1–6", ("Hebrews", 11, 1, 6)),
+            ("John 3:16", ("John", 3, 16, None)),
+            ("Matthew 2112", ("Matthew", 21, 12, None)),
+        ])
+
+    def test_offsets(self):
+        for span in iter_references(TRANSCRIPT):
+            self.assertIsInstance(span, ReferenceSpan)
+            self.assertEqual(TRANSCRIPT[span.start:span.end], span.text)
+
+    def test_requires_chapter(self):
+        self.assertEqual(found("Mark my words, John said so. Read Genesis."), [])
+        self.assertEqual(found("Johnson 3 and Marked 4"), [])
+        self.assertEqual(found("turn to John 3"), [("John 3", ("John", 3, None, None))])
+
+    def test_out_of_range(self):
+        self.assertEqual(found("Romans 3:40 and John 3:40"), [])
+        # Jude has one chapter, of 25 verses.
+        self.assertEqual(found("Jude 30 and Jude 2:1"), [])
+
+    def test_one_chapter_books(self):
+        # A lone number is the verse. A shorter name inside a longer one ("John" in "3 John") is only tried if the longer can't be a reference.
+        self.assertEqual(found("Read Jude 3 and Philemon 6 and 3 John 4, and Obadiah 2"), [
+            ("Jude 3", ("Jude", 1, 3, None)),
+            ("Philemon 6", ("Philemon", 1, 6, None)),
+            ("3 John 4", ("3 John", 1, 4, None)),
+            ("Obadiah 2", ("Obadiah", 1, 2, None)),
+        ])
+
+    def test_synonyms(self):
+        # Synonyms that are everyday words need a verse.
+        self.assertEqual(found("name 3 things to ask 2 questions"), [])
+        self.assertEqual(found("ask 2:1 and name 3 verse 4"), [("ask 2:1", ("Acts", 2, 1, None)), ("name 3 verse 4", ("Nahum", 3, 4, None))])
+        self.assertEqual(found("ask 2:1", synonyms=False), [])
+        self.assertEqual(found("psalm 23", synonyms=False), [("psalm 23", ("Psalms", 23, None, None))])
+        self.assertEqual(found("First John 4:8", synonyms=False), [("First John 4:8", ("1 John", 4, 8, None))])
+
+    def test_chunks(self):
+        # References split across chunk boundaries are found the same as in a single string.
+        expected = list(iter_references(TRANSCRIPT))
+        for chunksize in range(1, 40):
+            self.assertEqual(list(iter_references(io.StringIO(TRANSCRIPT), chunksize=chunksize)), expected, chunksize)
+
+    def test_long_gaps(self):
+        # Runs of filler words or whitespace end a reference, in strings and in files read a chunk at a time.
+        for text in ["John " + "the " * 4 + "3", "John" + " " * 40 + "3"]:
+            self.assertEqual(found(text), [])
+            self.assertEqual(found(io.StringIO(text), chunksize=4), [])
+        self.assertEqual(found("John chapter the 3 and the verse 16"), [("John chapter the 3 and the verse 16", ("John", 3, 16, None))])
+
+    def test_bounded_carry(self):
+        # Text that can't be the rest of a reference isn't held over between chunks, so "John 3" is found without reading it all.
+        source = io.StringIO("John 3 " + "the " * 100000 + "Jude 1")
+        self.assertEqual(next(iter_references(source, chunksize=1000)).text, "John 3")
+        self.assertLess(source.tell(), 10000)
+
+    def test_empty(self):
+        self.assertEqual(found(""), [])
+        self.assertEqual(found(io.StringIO("")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
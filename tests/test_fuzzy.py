@@ -0,0 +1,72 @@
+import unittest
+import random
+from difflib import get_close_matches
+
+import sys
+sys.path.append("..")
+
+from bibleparser.book_chapter_verses import book_chapter_verses
+from bibleparser.fuzzy import FuzzyIndex
+
+
+def misspellings(words, seed=0, per_word=40):
+    """
+    Deterministically generate deletions, insertions, substitutions and transpositions of each word.
+    """
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz 123'
+    for word in words:
+        for _ in range(per_word):
+            chars = list(word)
+            for _ in range(rng.randint(1, 4)):
+                op = rng.randrange(4)
+                i = rng.randrange(len(chars)) if chars else 0
+                if op == 0 and chars:
+                    del chars[i]
+                elif op == 1:
+                    chars.insert(i, rng.choice(letters))
+                elif op == 2 and chars:
+                    chars[i] = rng.choice(letters)
+                elif op == 3 and len(chars) > 1:
+                    j = min(i+1, len(chars)-1)
+                    chars[i], chars[j] = chars[j], chars[i]
+            yield ''.join(chars)
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    def setUp(self):
+        self.keys = list(book_chapter_verses.keys())
+        self.index = FuzzyIndex(self.keys)
+
+    def assertParity(self, word, cutoff=0.6):
+        expected = get_close_matches(word, self.keys, n=1, cutoff=cutoff)
+        self.assertEqual(self.index.best_match(word, cutoff=cutoff), expected[0] if expected else None, word)
+
+    def test_known_mistranscriptions(self):
+        for word in ['michael', 'join', 'gen', '1 tessa', 'hag i', 'habit cook', 'hey guy', 'levitic us', 'dude', 'x', '', 'zzzz']:
+            self.assertParity(word)
+        self.assertEqual(self.index.best_match('michael'), 'micah')
+        self.assertEqual(self.index.best_match('join'), 'john')
+
+    def test_parity_with_difflib(self):
+        for word in misspellings(self.keys):
+            self.assertParity(word)
+
+    def test_parity_other_cutoffs(self):
+        for cutoff in (0.0, 0.3, 0.8, 1.0):
+            for word in misspellings(self.keys, seed=cutoff, per_word=3):
+                self.assertParity(word, cutoff=cutoff)
+
+    def test_deterministic(self):
+        words = list(misspellings(self.keys, seed=1, per_word=5))
+        first = [self.index.best_match(w) for w in words]
+        shuffled = FuzzyIndex(reversed(self.keys))
+        self.assertEqual([shuffled.best_match(w) for w in words], first)
+
+    def test_invalid_cutoff(self):
+        with self.assertRaises(ValueError):
+            self.index.best_match('john', cutoff=1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import marshal
+import os
+import subprocess
+import tempfile
+import unittest
+
+import sys
+sys.path.append("..")
+
+from bibleparser import artifact, verse_table
+from bibleparser.fuzzy import FuzzyIndex
+
+
+# Modules that parse-only callers shouldn't pay for.
+HEAVY_MODULES = {'asyncio', 'concurrent.futures', 'difflib', 'http.client', 'json', 'sqlite3', 'ssl', 'urllib.request'}
+
+# Import budget for the package's own modules, in milliseconds. Generous, to allow for slow CI machines.
+IMPORT_BUDGET_MS = float(os.environ.get('BIBLEPARSER_IMPORT_BUDGET_MS', 25))
+
+
+def run(code:str, importtime:bool=False, **env) -> subprocess.CompletedProcess:
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(p for p in sys.path if p), **env}
+    args = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    return subprocess.run(args, env=env, capture_output=True, text=True, check=True)
+
+def import_times(stderr:str) -> dict:
+    """
+    Parse -X importtime output into {module: (self_us, cumulative_us)}.
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line and 'self [us]' not in line:
+            selftime, cumulative, name = line[len('import time:'):].split('|')
+            times[name.strip()] = (int(selftime), int(cumulative))
+    return times
+
+
+class TestImportCost(unittest.TestCase):
+    def test_parse_only_import_is_light(self):
+        times = import_times(run('import bibleparser.bibleparser', importtime=True).stderr)
+        self.assertIn('bibleparser.bibleparser', times)
+        self.assertEqual(HEAVY_MODULES & set(times), set())
+
+    def test_parsing_does_not_load_networking(self):
+        code = 'import sys; from bibleparser.bibleparser import parse_reference; parse_reference("John 3:16"); parse_reference("hey guy 223"); print(" ".join(sorted(sys.modules)))'
+        self.assertEqual(HEAVY_MODULES & set(run(code).stdout.split()), set())
+
+    def test_fuzzy_matching_loads_difflib_on_demand(self):
+        code = 'import sys; from bibleparser.bibleparser import parse_reference; parse_reference("Michael 1 1"); print(" ".join(sorted(sys.modules)))'
+        self.assertIn('difflib', run(code).stdout.split())
+
+    def test_passage_api_is_still_importable(self):
+        code = 'from bibleparser.bibleparser import fetch_passage, set_default_backend; import sys; print("http.client" in sys.modules)'
+        self.assertEqual(run(code).stdout.strip(), 'True')
+
+    def test_import_budget(self):
+        # Compile once into a private bytecode cache, then take the best of a few runs.
+        with tempfile.TemporaryDirectory() as pycache:
+            env = {'PYTHONDONTWRITEBYTECODE': '', 'PYTHONPYCACHEPREFIX': pycache}
+            run('import bibleparser.bibleparser', **env)
+            costs = []
+            for _ in range(3):
+                times = import_times(run('import bibleparser.bibleparser', importtime=True, **env).stderr)
+                costs.append(sum(t[0] for name,t in times.items() if name.split('.')[0] == 'bibleparser') / 1000)
+        self.assertLess(min(costs), IMPORT_BUDGET_MS)
+
+
+class TestArtifact(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'tables.marshal')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        contents = artifact.build(self.path)
+        self.assertEqual(artifact._load(self.path), contents)
+        index = FuzzyIndex.from_state(contents['book_index'][1])
+        for word in ['michael', 'join', 'gen', 'habit cook', 'zzzz']:
+            self.assertEqual(index.best_match(word), FuzzyIndex(verse_table.BOOKS).best_match(word))
+
+    def test_unusable_artifacts_are_ignored(self):
+        self.assertEqual(artifact._load(os.path.join(self.tmp.name, 'missing.marshal')), {})
+        with open(self.path, 'wb') as f:
+            f.write(b'garbage')
+        self.assertEqual(artifact._load(self.path), {})
+
+    def test_stale_tables_are_ignored(self):
+        # An artifact from a version with another number word: its pattern matches "zillion", which this version can't convert.
+        contents = artifact.build(self.path)
+        numbers, pattern = contents['number_words_pattern']
+        contents['number_words_pattern'] = ({**numbers, 'zillion': '1000'}, pattern.replace(r'\b(?:', r'\b(?:zillion|', 1))
+        with open(self.path, 'wb') as f:
+            marshal.dump(contents, f)
+        code = 'from bibleparser.bibleparser import parse_reference; print(parse_reference("john zillion three sixteen"))'
+        without = run(code, BIBLEPARSER_ARTIFACT=os.path.join(self.tmp.name, 'missing.marshal')).stdout
+        self.assertEqual(run(code, BIBLEPARSER_ARTIFACT=self.path).stdout, without)
+
+        artifact._contents = artifact._load(self.path)
+        try:
+            self.assertIsNone(artifact.get('number_words_pattern', numbers))
+            self.assertEqual(artifact.get('verse_table', verse_table._CANON), contents['verse_table'][1])
+        finally:
+            artifact.reset()
+
+    def test_parsing_from_artifact(self):
+        artifact.main(['--output', self.path])
+        code = '''
+from bibleparser import artifact, verse_table
+from bibleparser.bibleparser import parse_reference
+print(parse_reference("Michael 11"), parse_reference("psalm forty-two"), parse_reference("matthew 2112"), verse_table.TOTAL_VERSES, sep="|")
+print(sorted(artifact._contents))
+'''
+        expected = run(code, BIBLEPARSER_ARTIFACT=os.path.join(self.tmp.name, 'missing.marshal')).stdout.splitlines()
+        actual = run(code, BIBLEPARSER_ARTIFACT=self.path).stdout.splitlines()
+        self.assertEqual(actual[0], expected[0])
+        self.assertEqual(actual[0], "Micah 1:1|Psalms 42|Matthew 21:12|31103")
+        self.assertEqual(expected[1], '[]')
+        self.assertIn('verse_table', actual[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import sys
+sys.path.append("..")
+
+from bibleparser import bibleparser, instrument
+from bibleparser.bibleparser import disable_cache, enable_cache, fetch_passage, fetch_passage_async, parse_reference
+from bibleparser.client import PassageClient
+from bibleparser.instrument import MetricsAggregator, add_hook, remove_hook
+from bibleparser.passage_cache import CachedBackend, PassageCache
+from bibleparser.reference import parse_ranges
+from bibleparser.testing import StubServer
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, stage, seconds, tags):
+        self.events.append((stage, tags))
+
+    def tags(self, stage):
+        return [tags for s, tags in self.events if s == stage]
+
+
+class TestHooks(unittest.TestCase):
+    def setUp(self):
+        self.recorder = add_hook(Recorder())
+
+    def tearDown(self):
+        remove_hook(self.recorder)
+        disable_cache()
+
+    def test_stages(self):
+        self.assertEqual(parse_reference("John 3:16"), "John 3:16")
+        self.assertEqual(self.recorder.events, [
+            ('digitize', ()), ('filter', ()), ('format_book', ()), ('range_check', ()), ('parse', ()),
+        ])
+
+    def test_same_pipeline(self):
+        # With and without hooks, parse_parts() runs the same stage functions.
+        with mock.patch.object(bibleparser, 'format_book', return_value="Jude"):
+            hooked = parse_reference("john 3")
+            remove_hook(self.recorder)
+            try:
+                self.assertEqual(parse_reference("john 3"), hooked)
+            finally:
+                add_hook(self.recorder)
+        self.assertEqual(hooked, "Jude 1:3")
+
+    def test_tags(self):
+        parse_reference("psalm 23")
+        parse_reference("Jhon 3 16")
+        parse_reference("xyzzy 3")
+        parse_reference("matthew 2112")
+        self.assertEqual(self.recorder.tags('format_book'), [('synonym',), ('fuzzy_match',), ('unknown_book',), ()])
+        self.assertEqual(self.recorder.tags('range_check'), [(), (), (), ('chapter_split',)])
+
+    def test_error(self):
+        with self.assertRaises(ValueError):
+            parse_reference("the")
+        self.assertEqual(self.recorder.events, [('digitize', ()), ('filter', ('error',)), ('parse', ('error',))])
+
+    def test_list(self):
+        parse_ranges("Romans 8:28; 12:1")
+        parse_ranges("John 3:16-18")
+        parse_ranges("John 3 16")
+        self.assertEqual(self.recorder.tags('parse_list'), [('list',), ()])
+        self.assertEqual(self.recorder.tags('parse'), [(), ()])
+
+    def test_cache_hit(self):
+        enable_cache()
+        parse_reference("John 3:16")
+        parse_reference("John  3:16")
+        self.assertEqual(self.recorder.tags('parse'), [(), ('cache_hit',)])
+        self.assertEqual(len(self.recorder.tags('digitize')), 1)
+
+    def test_fetch(self):
+        with StubServer() as stub, PassageClient(stub.url) as client:
+            backend = CachedBackend(client, PassageCache())
+            fetch_passage("John 3:16", backend)
+            fetch_passage("John 3:16", backend)
+
+            async def fetch_async():
+                await fetch_passage_async("Romans 8:28; 12:1", backend)
+                await client.aclose()
+
+            asyncio.run(fetch_async())
+        self.assertEqual(self.recorder.tags('fetch'), [(), (), ()])
+        self.assertEqual(self.recorder.tags('passage_cache'), [('cache_miss',), ('cache_hit',), ('cache_miss',)])
+
+    def test_remove_hook(self):
+        remove_hook(self.recorder)
+        parse_reference("John 3:16")
+        self.assertEqual(self.recorder.events, [])
+        with self.assertRaises(ValueError):
+            remove_hook(self.recorder)
+        add_hook(self.recorder)
+
+    def test_concurrent_registration(self):
+        # Hooks registered and removed from many threads at once are neither lost nor left behind.
+        def churn(_):
+            for _ in range(200):
+                hook = Recorder()
+                add_hook(hook)
+                remove_hook(hook)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(8) as executor:
+                list(executor.map(churn, range(8)))
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(instrument.hooks, (self.recorder,))
+
+
+class TestMetricsAggregator(unittest.TestCase):
+    def test_snapshot(self):
+        metrics = MetricsAggregator(buckets=(0.001, 0.01))
+        metrics('fetch', 0.0005, ())
+        metrics('fetch', 0.001, ('error',))
+        metrics('fetch', 0.5, ('error',))
+        self.assertEqual(metrics.snapshot(), {'fetch': {
+            'count': 3, 'sum': 0.5015, 'buckets': [(0.001, 2), (0.01, 2), (float('inf'), 3)], 'tags': {'error': 2},
+        }})
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_prometheus(self):
+        metrics = MetricsAggregator(buckets=(0.001,))
+        metrics('format_book', 0.0005, ('fuzzy_match',))
+        self.assertEqual(metrics.prometheus(), '\n'.join([
+            '# HELP bibleparser_stage_seconds Time spent in each stage of the pipeline.',
+            '# TYPE bibleparser_stage_seconds histogram',
+            'bibleparser_stage_seconds_bucket{stage="format_book",le="0.001"} 1',
+            'bibleparser_stage_seconds_bucket{stage="format_book",le="+Inf"} 1',
+            'bibleparser_stage_seconds_sum{stage="format_book"} 0.0005',
+            'bibleparser_stage_seconds_count{stage="format_book"} 1',
+            '# HELP bibleparser_stage_tags_total Outcomes reported by each stage.',
+            '# TYPE bibleparser_stage_tags_total counter',
+            'bibleparser_stage_tags_total{stage="format_book",tag="fuzzy_match"} 1',
+        ]) + '\n')
+
+    def test_as_hook(self):
+        metrics = add_hook(MetricsAggregator())
+        try:
+            parse_reference("matthew 2112")
+        finally:
+            remove_hook(metrics)
+        snapshot = metrics.snapshot()
+        self.assertEqual(set(snapshot), {'digitize', 'filter', 'format_book', 'range_check', 'parse'})
+        self.assertEqual(snapshot['range_check']['tags'], {'chapter_split': 1})
+
+    def test_invalid_buckets(self):
+        with self.assertRaises(ValueError):
+            MetricsAggregator(buckets=(0.01, 0.001))
+
+
+if __name__ == '__main__':
+    unittest.main()
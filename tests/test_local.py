@@ -0,0 +1,143 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+import sys
+sys.path.append("..")
+
+from bibleparser.bibleparser import fetch_passage
+from bibleparser.book_chapter_verses import book_chapter_verses
+from bibleparser.client import PassageFetchError
+from bibleparser.local import LocalBible, build, main, read_records
+
+
+def records():
+    # A synthetic translation whose text is each verse's own reference.
+    for b, (book, chapters) in enumerate(book_chapter_verses.items()):
+        for chapter, verses in chapters.items():
+            for verse in range(1, verses+1):
+                yield (b+1, chapter, verse, f' {book} {chapter}:{verse} ')
+
+
+class TestLocalBible(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, 'synthetic.bible')
+        build(records(), cls.path, translation='synthetic')
+        cls.bible = LocalBible(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.bible.close()
+        cls.tmp.cleanup()
+
+    def test_verse(self):
+        self.assertEqual(self.bible.fetch("John 3:16"), {
+            'reference': "John 3:16",
+            'text': "john 3:16\n",
+            'translation_id': "synthetic",
+        })
+
+    def test_verse_range(self):
+        self.assertEqual(self.bible.fetch("John 3:16-18")['text'], "john 3:16\njohn 3:17\njohn 3:18\n")
+        self.assertEqual(self.bible.fetch("John 3:35-99")['text'], "john 3:35\njohn 3:36\n")
+
+    def test_chapter_and_book(self):
+        self.assertEqual(self.bible.fetch("Psalms 117")['text'], "psalms 117:1\npsalms 117:2\n")
+        text = self.bible.fetch("Jude")['text']
+        self.assertTrue(text.startswith("jude 1:1\n") and text.endswith("jude 1:25\n"))
+        self.assertEqual(self.bible.fetch("Genesis")['text'].count("\n"), sum(book_chapter_verses["genesis"].values()))
+
+    def test_ranges(self):
+        self.assertEqual(self.bible.fetch("Romans 8:28,12:1-2")['text'], "romans 8:28\nromans 12:1\nromans 12:2\n")
+        self.assertEqual(self.bible.fetch("John 3:36-4:1")['text'], "john 3:36\njohn 4:1\n")
+        self.assertEqual(fetch_passage("Jude 3, 5; Obadiah 1:2", self.bible)['text'], "jude 1:3\njude 1:5\nobadiah 1:2\n")
+        with self.assertRaises(PassageFetchError):
+            self.bible.fetch("Romans 8:28,8:40")
+
+    def test_chapter_range_in_list(self):
+        # A book's only item in a list is still sent with its verses, which LocalBible reads as a list.
+        result = fetch_passage("John 3:16; Psalm 24-25", self.bible)
+        self.assertEqual(result['parsed'], "John 3:16; Psalms 24:1-25:22")
+        self.assertTrue(result['text'].startswith("john 3:16\npsalms 24:1\n") and result['text'].endswith("psalms 25:22\n"))
+        self.assertEqual(fetch_passage("John 3:16; 1 John 2-3", self.bible)['text'].count("\n"), 1 + 29 + 24)
+
+    def test_text_view_is_zero_copy(self):
+        first, last = self.bible.ordinals("Revelation 22:20-21")
+        view = self.bible.text_view(first, last)
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(bytes(view), b"revelation 22:20\nrevelation 22:21\n")
+        view.release()
+
+    def test_not_found(self):
+        for passage in ["John 22:1", "John 3:99", "John 3:18-16", "Hezekiah 1:1"]:
+            with self.assertRaises(PassageFetchError) as cm:
+                self.bible.fetch(passage)
+            self.assertEqual(cm.exception.status, 404)
+
+    def test_fetch_passage(self):
+        self.assertEqual(fetch_passage("john three sixteen", self.bible)['text'], "john 3:16\n")
+        self.assertEqual(fetch_passage("Jude 5", self.bible)['text'], "jude 1:5\n")
+
+    def test_not_a_bible_file(self):
+        path = os.path.join(self.tmp.name, 'junk.bible')
+        with open(path, 'wb') as f:
+            f.write(b'not a bible file')
+        with self.assertRaises(ValueError):
+            LocalBible(path)
+
+
+class TestBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_missing_and_unknown_verses(self):
+        skipped = build([("John", 3, 16, "For God so loved the world"), ("Jude", 1, 99, "?")], self.path('partial.bible'))
+        self.assertEqual(skipped, 1)
+        with LocalBible(self.path('partial.bible')) as bible:
+            self.assertEqual(bible.fetch("John 3:15-16")['text'], "For God so loved the world\n")
+            self.assertEqual(bible.translation_id, '')
+
+    def test_unknown_books(self):
+        # A source with the Apocrypha: its books are skipped, not matched to similarly named ones.
+        source = [
+            ("Titus", 1, 1, "Paul, a servant of God"), ("Ruth", 1, 1, "Now it came to pass"),
+            ("Tobit", 1, 1, "The book of the words of Tobit"), ("Judith", 1, 1, "In the twelfth year"),
+            ("Baruch", 1, 1, "These are the words"), ("Sirach", 1, 1, "All wisdom cometh from the Lord"),
+            ("1 Maccabees", 1, 1, "And it happened"), ("Psalm", 151, 1, "I was small among my brethren"),
+            (67, 1, 1, "?"), ("Song of Songs", 1, 1, "The song of songs, which is Solomon's"),
+        ]
+        self.assertEqual(build(source, self.path('apocrypha.bible')), 7)
+        with LocalBible(self.path('apocrypha.bible')) as bible:
+            self.assertEqual(bible.fetch("Titus 1:1")['text'], "Paul, a servant of God\n")
+            self.assertEqual(bible.fetch("Ruth 1:1")['text'], "Now it came to pass\n")
+            self.assertEqual(bible.fetch("Song of Solomon 1:1")['text'], "The song of songs, which is Solomon's\n")
+
+    def test_command_json_and_csv(self):
+        rows = [{'book': "1st John", 'chapter': 1, 'verse': 1, 'text': "That which was from the beginning"}]
+        with open(self.path('source.json'), 'w', encoding='utf-8') as f:
+            json.dump({'verses': rows}, f)
+        with open(self.path('source.csv'), 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, ['book', 'chapter', 'verse', 'text'])
+            writer.writeheader()
+            writer.writerows(rows)
+
+        self.assertEqual(list(read_records(self.path('source.csv'))), [("1st John", '1', '1', "That which was from the beginning")])
+        for source in ('source.json', 'source.csv'):
+            main([self.path(source), self.path('out.bible'), '--translation', 'web'])
+            with LocalBible(self.path('out.bible')) as bible:
+                self.assertEqual(bible.fetch("1 John 1:1")['text'], "That which was from the beginning\n")
+                self.assertEqual(bible.translation_id, 'web')
+
+
+if __name__ == '__main__':
+    unittest.main()
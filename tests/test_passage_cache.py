@@ -0,0 +1,198 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from multiprocessing import Pool
+
+import sys
+sys.path.append("..")
+
+from bibleparser.bibleparser import fetch_passage, fetch_passage_async
+from bibleparser.cache import LRUCache
+from bibleparser.client import PassageClient
+from bibleparser.passage_cache import CachedBackend, PassageCache, SqliteCache
+from bibleparser.testing import AsyncStubServer, StubServer
+
+
+def _put_from_process(args):
+    path, key = args
+    SqliteCache(path).put(key, {'text': key})
+    return key
+
+
+class TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'passages.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+class TestLRUCacheTTL(unittest.TestCase):
+    def test_expiry(self):
+        cache = LRUCache(2, ttl=0.05)
+        cache.put('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_entry_ttl(self):
+        cache = LRUCache(2, ttl=10)
+        cache.put('a', 1, 0.05)
+        cache.put('b', 2)
+        time.sleep(0.06)
+        self.assertEqual((cache.get('a'), cache.get('b')), (None, 2))
+
+
+class TestSqliteCache(TempDirTestCase):
+    def test_persists_across_instances(self):
+        SqliteCache(self.path).put("John 3:16", {'text': "For God so loved"})
+        cache = SqliteCache(self.path)
+        self.assertEqual(cache.get("John 3:16"), {'text': "For God so loved"})
+        self.assertIsNone(cache.get("John 3:17"))
+        self.assertEqual(cache.info(), (1, 1, 0, 100000, 1))
+
+    def test_eviction(self):
+        cache = SqliteCache(self.path, maxsize=2)
+        cache.put('a', 1)
+        time.sleep(0.01)
+        cache.put('b', 2)
+        time.sleep(0.01)
+        cache.get('a') # "b" is now least recently used
+        time.sleep(0.01)
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.info().evictions, 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_batched_access_times(self):
+        cache = SqliteCache(self.path)
+        cache.put('a', 1)
+        db = cache._db()
+        changes = db.total_changes
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(db.total_changes, changes)
+        cache.close()
+        self.assertEqual(cache._db().execute('SELECT COUNT(*) FROM passages WHERE used > stored').fetchone()[0], 1)
+
+    def test_ttl(self):
+        cache = SqliteCache(self.path, ttl=0.05)
+        cache.put('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_shared_between_processes(self):
+        SqliteCache(self.path) # create the schema up front
+        keys = [f'Psalms {n}' for n in range(1, 21)]
+        with Pool(4) as pool:
+            pool.map(_put_from_process, [(self.path, k) for k in keys])
+        cache = SqliteCache(self.path)
+        self.assertEqual(len(cache), 20)
+        self.assertEqual(cache.get('Psalms 7'), {'text': 'Psalms 7'})
+
+    def test_clear(self):
+        cache = SqliteCache(self.path)
+        cache.put('a', 1)
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 0, 100000, 0))
+
+
+class TestAsyncDiskTier(unittest.IsolatedAsyncioTestCase):
+    async def test_sqlite_runs_off_the_loop(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = PassageCache(os.path.join(tmp, 'passages.db'))
+            threads = []
+            lookup, store = cache.disk._lookup, cache.disk._store
+            cache.disk._lookup = lambda *args: threads.append(threading.get_ident()) or lookup(*args)
+            cache.disk._store = lambda *args: threads.append(threading.get_ident()) or store(*args)
+
+            async with AsyncStubServer() as stub:
+                client = PassageClient(stub.url)
+                backend = CachedBackend(client, cache)
+                self.assertEqual((await fetch_passage_async("John 3:16", backend))['text'], "Text of John 3:16.\n")
+                cache.memory.clear()
+                self.assertEqual((await fetch_passage_async("John 3:16", backend))['text'], "Text of John 3:16.\n")
+                await client.aclose()
+                self.assertEqual(stub.hits, 1)
+            cache.close()
+            self.assertEqual(len(threads), 3)
+            self.assertNotIn(threading.get_ident(), threads)
+
+
+class TestPassageCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stub = StubServer().start()
+        self.client = PassageClient(self.stub.url)
+
+    def tearDown(self):
+        self.client.close()
+        self.stub.stop()
+        super().tearDown()
+
+    def test_cached_backend(self):
+        backend = CachedBackend(self.client, PassageCache(self.path))
+        for text in ["John 3:16", "john three sixteen", "JOHN 3 16"]:
+            self.assertEqual(fetch_passage(text, backend)['text'], "Text of John 3:16.\n")
+        self.assertEqual(self.stub.hits, 1)
+        self.assertEqual(backend.cache.info().memory.hits, 2)
+
+    def test_disk_tier_survives_restart(self):
+        fetch_passage("John 3:16", CachedBackend(self.client, PassageCache(self.path)))
+        cache = PassageCache(self.path)
+        self.assertEqual(fetch_passage("John 3:16", CachedBackend(self.client, cache))['text'], "Text of John 3:16.\n")
+        self.assertEqual(self.stub.hits, 1)
+        self.assertEqual(cache.info().disk.hits, 1)
+        self.assertEqual(cache.info().memory.currsize, 1)
+
+    def test_returns_copies(self):
+        for cache in [PassageCache(), PassageCache(self.path, maxsize=1)]:
+            cache.put("John 3:16", {'verses': [1]})
+            cache.get("John 3:16")['verses'].append(2)
+            cache.put("John 3:17", {})
+            self.assertEqual(cache.get("John 3:16"), {'verses': [1]})
+            self.assertEqual(cache.get("John 3:16"), {'verses': [1]})
+            cache.close()
+
+    def test_promotion_keeps_expiry(self):
+        SqliteCache(self.path).put("John 3:16", {'text': "x"})
+        time.sleep(0.1)
+        cache = PassageCache(self.path, ttl=0.15)
+        self.assertEqual(cache.get("John 3:16"), {'text': "x"})
+        time.sleep(0.06)
+        self.assertIsNone(cache.memory.get("John 3:16"))
+        cache.close()
+
+    def test_memory_only(self):
+        cache = PassageCache()
+        self.assertIsNone(cache.info().disk)
+        cache.put("John 3:16", {'text': "x"})
+        self.assertEqual(cache.get("John 3:16"), {'text': "x"})
+
+    def test_warm(self):
+        cache = PassageCache(self.path)
+        self.assertEqual(cache.warm(["John 3:16", "john three sixteen", "Psalm 23"], backend=self.client), 2)
+        self.assertEqual(cache.warm(["Psalm 23"], backend=CachedBackend(self.client, cache)), 0)
+        self.assertEqual(self.stub.hits, 2)
+        self.assertEqual(cache.get("Psalms 23")['text'], "Text of Psalms 23.\n")
+
+    def test_warm_lists(self):
+        # Lists are cached under the queries fetch_passage() makes, so fetching them afterwards doesn't go upstream.
+        cache = PassageCache(self.path)
+        self.assertEqual(cache.warm(["Romans 8:28; 12:1-2", "John 3:16; Psalm 24-25"], backend=self.client), 3)
+        backend = CachedBackend(self.client, cache)
+        for text in ["Romans 8:28; 12:1-2", "John 3:16; Psalm 24-25", "John 3:16"]:
+            fetch_passage(text, backend)
+        self.assertEqual(self.stub.hits, 3)
+        self.assertEqual(cache.info().memory.currsize, 3)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import pickle
+import unittest
+
+import sys
+sys.path.append("..")
+
+from bibleparser.bibleparser import cache_info, disable_cache, enable_cache, parse_reference
+from bibleparser.reference import Reference, format_ranges, merge_references, parse_ranges
+from bibleparser.verse_table import TOTAL_VERSES, verse_ordinal
+
+
+class TestReference(unittest.TestCase):
+    def test_str(self):
+        self.assertEqual(str(Reference('John')), "John")
+        self.assertEqual(str(Reference('John', 3)), "John 3")
+        self.assertEqual(str(Reference('John', 3, 16)), "John 3:16")
+        self.assertEqual(str(Reference('John', 3, 16, 18)), "John 3:16-18")
+        self.assertEqual(str(Reference('John', 3, 16, 2, chapter_end=4)), "John 3:16-4:2")
+        self.assertEqual(str(Reference('John', 3, chapter_end=4)), "John 3-4")
+        self.assertEqual(str(Reference('song of solomon', 4, 5)), "Song Of Solomon 4:5")
+
+    def test_canonical(self):
+        # Equal passages have the same, most compact, form.
+        self.assertEqual(str(Reference('John', 3, 16, 16)), "John 3:16")
+        self.assertEqual(str(Reference('John', 3, 1, 36)), "John 3")
+        self.assertEqual(str(Reference('Jude', 1)), "Jude")
+        self.assertEqual(Reference('John', 3, 1, 36), Reference('John', 3))
+
+    def test_parse_reference_compatible(self):
+        for text in ["John 3:16", "john 3 16 to 18", "1st JOHN chapter 3", "two corinthians", "psalm forty-two", "matthew 2112"]:
+            self.assertEqual(str(Reference.parse(text)), parse_reference(text))
+
+    def test_validation(self):
+        for args in [('John', 22), ('John', 3, 37), ('John', 3, 16, 15), ('Johnny', 1), ('John', None, 3), ('John', 3, None, 5)]:
+            with self.assertRaises(ValueError):
+                Reference(*args)
+        with self.assertRaises(ValueError):
+            Reference.from_ordinals(TOTAL_VERSES)
+        with self.assertRaises(ValueError):
+            Reference.from_ordinals(verse_ordinal('genesis', 50, 26), verse_ordinal('exodus', 1, 1))
+
+    def test_ordinals(self):
+        ref = Reference('John', 3, 16, 18)
+        start = verse_ordinal('john', 3, 16)
+        self.assertEqual(ref.ordinals, (start, start + 2))
+        self.assertEqual(len(ref), 3)
+        self.assertEqual(Reference.from_ordinals(*ref.ordinals), ref)
+        self.assertEqual(ref.start, ('John', 3, 16))
+        self.assertEqual(ref.end, ('John', 3, 18))
+        self.assertEqual(str(Reference.from_ordinals(TOTAL_VERSES - 1)), "Revelation 22:21")
+
+    def test_parts(self):
+        self.assertEqual(Reference('John', 3, 16, 18).to_parts(), ('John', 3, 16, 18))
+        self.assertEqual(Reference('John').to_parts(), ('John', None, None, None))
+        self.assertEqual(Reference.from_parts(('John', 3, 16, None)), Reference('John', 3, 16))
+        with self.assertRaises(ValueError):
+            Reference('John', 3, 16, 2, chapter_end=4).to_parts()
+
+    def test_immutable(self):
+        ref = Reference('John', 3, 16)
+        with self.assertRaises(AttributeError):
+            ref._start = 0
+        with self.assertRaises(AttributeError):
+            ref.other = 0
+        self.assertEqual(pickle.loads(pickle.dumps(ref)), ref)
+
+    def test_hash_and_order(self):
+        refs = [Reference('John', 3, 16, 18), Reference('Genesis', 1), Reference('John', 3, 16), Reference('John', 3, 16)]
+        self.assertEqual(len(set(refs)), 3)
+        expected = [Reference('Genesis', 1), Reference('John', 3, 16), Reference('John', 3, 16), Reference('John', 3, 16, 18)]
+        self.assertEqual(sorted(refs), expected)
+        self.assertEqual(sorted(refs, key=Reference.sort_key), expected)
+        self.assertLess(Reference('John', 3, 16), Reference('John', 3, 16, 17))
+        self.assertNotEqual(Reference('John', 3, 16), "John 3:16")
+
+    def test_ranges(self):
+        chapter = Reference('John', 3)
+        self.assertTrue(chapter.contains(Reference('John', 3, 16, 18)))
+        self.assertFalse(Reference('John', 3, 16).contains(chapter))
+        self.assertTrue(chapter.overlaps(Reference('John', 3, 36, 2, chapter_end=4)))
+        self.assertFalse(chapter.overlaps(Reference('John', 4)))
+        self.assertTrue(chapter.adjoins(Reference('John', 4)))
+        self.assertEqual(chapter.merge(Reference('John', 4, 1)), Reference('John', 3, 1, 1, chapter_end=4))
+        with self.assertRaises(ValueError):
+            chapter.merge(Reference('John', 5))
+        with self.assertRaises(ValueError):
+            # Adjacent ordinals, but different books.
+            Reference('Genesis', 50).merge(Reference('Exodus', 1))
+
+    def test_merge_references(self):
+        refs = [Reference('John', 3, 17, 18), Reference('Acts', 1), Reference('John', 3, 16), Reference('John', 3, 20), Reference('Luke', 24, 53)]
+        self.assertEqual([str(r) for r in merge_references(refs)], ["Luke 24:53", "John 3:16-18", "John 3:20", "Acts 1"])
+        self.assertEqual(merge_references([]), [])
+
+
+class TestParseRanges(unittest.TestCase):
+    def parsed(self, text):
+        return [str(r) for r in parse_ranges(text)]
+
+    def test_lists(self):
+        self.assertEqual(self.parsed("Romans 8:28; 12:1-2"), ["Romans 8:28", "Romans 12:1-2"])
+        self.assertEqual(self.parsed("John 3:16,18"), ["John 3:16", "John 3:18"])
+        self.assertEqual(self.parsed("Romans 12:1-2,5-7,9,13:1-9"), ["Romans 12:1-2", "Romans 12:5-7", "Romans 12:9", "Romans 13:1-9"])
+        self.assertEqual(self.parsed("Psalm 23:1; 24"), ["Psalms 23:1", "Psalms 24"])
+        self.assertEqual(self.parsed("Genesis 1-2; 3:1"), ["Genesis 1-2", "Genesis 3:1"])
+        # Books with one chapter are numbered by verse.
+        self.assertEqual(self.parsed("Jude 3, 5; Obadiah 1:2"), ["Jude 1:3", "Jude 1:5", "Obadiah 1:2"])
+
+    def test_books(self):
+        self.assertEqual(self.parsed("John 3:16; Romans 8:28, 31"), ["John 3:16", "Romans 8:28", "Romans 8:31"])
+        self.assertEqual(self.parsed("first john 1:9; 2:1"), ["1 John 1:9", "1 John 2:1"])
+
+    def test_cross_chapter(self):
+        self.assertEqual(self.parsed("John 3:16-4:2"), ["John 3:16-4:2"])
+        self.assertEqual(self.parsed("John 3:16 - 4:2, 5"), ["John 3:16-4:2", "John 4:5"])
+
+    def test_single(self):
+        # Anything that isn't an explicit list is parsed as before.
+        self.assertEqual(self.parsed("john 3:16 & 17"), ["John 3:16-17"])
+        self.assertEqual(self.parsed("matthew 2112"), ["Matthew 21:12"])
+        self.assertEqual(self.parsed("John 3, 16"), ["John 3:16"])
+        self.assertEqual(self.parsed("2 Corinthians"), ["2 Corinthians"])
+        # Books with one chapter are numbered by verse here too.
+        self.assertEqual(self.parsed("Jude 5"), ["Jude 1:5"])
+        self.assertEqual(self.parsed("Jude 3-5"), ["Jude 1:3-5"])
+        self.assertEqual(self.parsed("jude three to five"), ["Jude 1:3-5"])
+        self.assertEqual(self.parsed("Jude 1"), ["Jude"])
+        with self.assertRaises(ValueError):
+            parse_ranges("Jude 3:5")
+        # Without a chapter:verse, punctuation is dictation noise, as it is to parse_reference().
+        self.assertEqual(self.parsed("john 3;16"), [parse_reference("john 3;16")])
+        self.assertEqual(self.parsed("john 3;16"), ["John 3:16"])
+
+    def test_differs_from_parse_reference(self):
+        # After a verse, a comma starts another verse, where parse_reference() sees a range.
+        self.assertEqual(self.parsed("John 3:16, 18"), ["John 3:16", "John 3:18"])
+        self.assertEqual(parse_reference("John 3:16, 18"), "John 3:16-18")
+
+    def test_cached(self):
+        enable_cache()
+        try:
+            first = parse_ranges("Romans 8:28; 12:1-2")
+            first.append(None)
+            self.assertEqual(self.parsed("Romans 8:28;  12:1-2"), ["Romans 8:28", "Romans 12:1-2"])
+            self.assertEqual(cache_info().hits, 1)
+        finally:
+            disable_cache()
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_ranges("Romans 8:28; 17:1")
+
+    def test_format_ranges(self):
+        self.assertEqual(format_ranges(parse_ranges("Romans 8:28; 12:1-2")), ["Romans 8:28,12:1-2"])
+        self.assertEqual(format_ranges(parse_ranges("Psalm 23:1-6; 24")), ["Psalms 23:1-6,24:1-10"])
+        self.assertEqual(format_ranges(parse_ranges("John 3:16; Romans 8:28")), ["John 3:16", "Romans 8:28"])
+        self.assertEqual(format_ranges(parse_ranges("John 3:16; Psalm 24-25; Jude 3-5")), ["John 3:16", "Psalms 24:1-25:22", "Jude 1:3-5"])
+        self.assertEqual(format_ranges([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
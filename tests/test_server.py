@@ -0,0 +1,205 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import sys
+sys.path.append("..")
+
+from bibleparser._asynchttp import read_response
+from bibleparser.__main__ import main
+from bibleparser.client import PassageClient
+from bibleparser.instrument import MetricsAggregator, add_hook, remove_hook
+from bibleparser.server import ParseBatcher, ParseServer
+from bibleparser.testing import AsyncStubServer
+
+
+class Connection:
+    """
+    A keep-alive HTTP connection to the server under test.
+    """
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+
+    @classmethod
+    async def open(cls, server:ParseServer):
+        if server.path:
+            return cls(*await asyncio.open_unix_connection(server.path))
+        host, port = server.address[len('http://'):].rsplit(':', 1)
+        return cls(*await asyncio.open_connection(host, int(port)))
+
+    async def request(self, target:str, method:str='GET', body:bytes=b'') -> tuple:
+        self.writer.write(f'{method} {target} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+        status, _, headers, body = await read_response(self.reader)
+        return (status, json.loads(body) if headers['content-type'] == 'application/json' else body.decode('utf-8'))
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+class TestParseBatcher(unittest.IsolatedAsyncioTestCase):
+    async def test_batches(self):
+        batcher = ParseBatcher()
+        results = await asyncio.gather(*(batcher.parse(text) for text in ["john 3 16", "john 3 16", "matthew 2112", "the"]))
+        self.assertEqual(results[:3], ["John 3:16", "John 3:16", "Matthew 21:12"])
+        self.assertIsInstance(results[3], ValueError)
+        self.assertEqual((batcher.batches, batcher.parsed), (1, 3))
+
+    async def test_max_batch(self):
+        batcher = ParseBatcher(batch_window=10, max_batch=2)
+        results = await asyncio.gather(*(batcher.parse(text) for text in ["john 3 16", "romans 8 28"]))
+        self.assertEqual(results, ["John 3:16", "Romans 8:28"])
+        self.assertEqual(batcher.batches, 1)
+
+    async def test_executor(self):
+        with ThreadPoolExecutor(1) as executor:
+            batcher = ParseBatcher(executor=executor)
+            results = await asyncio.gather(*(batcher.parse(text) for text in ["psalm forty-two", "xyzzy"]))
+        self.assertEqual(results, ["Psalms 42", "Xyzzy"])
+
+    def test_invalid_max_batch(self):
+        with self.assertRaises(ValueError):
+            ParseBatcher(max_batch=0)
+
+
+class TestParseServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.stub = await AsyncStubServer().start()
+        self.client = PassageClient(self.stub.url, backoff=0, retries=0)
+        self.server = await ParseServer(port=0, backend=self.client, grace=1).start()
+        self.conn = await Connection.open(self.server)
+
+    async def asyncTearDown(self):
+        await self.conn.close()
+        await self.server.stop()
+        await self.client.aclose()
+        await self.stub.stop()
+
+    async def test_parse(self):
+        self.assertEqual(await self.conn.request('/parse?q=john+three+sixteen'), (200, {'input': "john three sixteen", 'parsed': "John 3:16"}))
+        self.assertEqual(await self.conn.request('/parse?q=the'), (400, {'input': "the", 'error': 'Could not parse book from "the".'}))
+
+    async def test_parse_many(self):
+        body = json.dumps({'references': ["hey guy 2 3", "the"]}).encode('utf-8')
+        status, data = await self.conn.request('/parse', 'POST', body)
+        self.assertEqual(status, 200)
+        self.assertEqual(data['results'][0], {'input': "hey guy 2 3", 'parsed': "Haggai 2:3"})
+        self.assertIn('error', data['results'][1])
+        self.assertEqual((await self.conn.request('/parse', 'POST', b'["john 3 16"]'))[0], 400)
+
+    async def test_body_too_large(self):
+        self.server.max_body = 100
+        body = json.dumps({'references': ["john 3 16"] * 20}).encode('utf-8')
+        conn = await Connection.open(self.server)
+        try:
+            # Only the headers are sent: the server answers without waiting for the body.
+            conn.writer.write(f'POST /parse HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n'.encode('latin-1'))
+            status, _, headers, data = await asyncio.wait_for(read_response(conn.reader), 1)
+            self.assertEqual((status, headers['connection']), (413, 'close'))
+            self.assertEqual(json.loads(data), {'error': 'Body is longer than 100 bytes.'})
+        finally:
+            await conn.close()
+
+        conn = await Connection.open(self.server)
+        try:
+            conn.writer.write(b'POST /parse HTTP/1.1\r\nHost: test\r\nTransfer-Encoding: chunked\r\n\r\n' + b'50\r\n' + b'x' * 80 + b'\r\n' + b'50\r\n')
+            self.assertEqual((await asyncio.wait_for(read_response(conn.reader), 1))[0], 413)
+        finally:
+            await conn.close()
+
+    async def test_concurrent_requests_are_batched(self):
+        conns = [await Connection.open(self.server) for _ in range(5)]
+        try:
+            results = await asyncio.gather(*(conn.request('/parse?q=romans+8+28') for conn in conns))
+        finally:
+            for conn in conns:
+                await conn.close()
+        self.assertEqual(results, [(200, {'input': "romans 8 28", 'parsed': "Romans 8:28"})] * 5)
+        self.assertLess(self.server.batcher.batches, 5)
+
+    async def test_passage(self):
+        status, data = await self.conn.request('/passage?q=john+3+16')
+        self.assertEqual((status, data['parsed'], data['text']), (200, "John 3:16", "Text of John 3:16.\n"))
+        self.stub.failures = [404]
+        self.assertEqual((await self.conn.request('/passage?q=john+3+16'))[0], 404)
+        self.stub.failures = [503]
+        self.assertEqual((await self.conn.request('/passage?q=john+3+16'))[0], 502)
+        self.assertEqual((await self.conn.request('/passage?q=the'))[0], 400)
+        # A semicolon without a chapter:verse is read like parse_reference() reads it, not as a list of chapters.
+        self.assertEqual((await self.conn.request('/passage?q=john+3%3B16'))[1]['parsed'], "John 3:16")
+
+    async def test_internal_error(self):
+        class Broken:
+            async def fetch_async(self, passage):
+                raise KeyError(passage)
+
+        self.server.backend = Broken()
+        with self.assertLogs('bibleparser.server', 'ERROR'):
+            self.assertEqual(await self.conn.request('/passage?q=john+3+16'), (500, {'error': "Internal server error."}))
+        # The connection is still usable.
+        self.assertEqual((await self.conn.request('/parse?q=john+3+16'))[0], 200)
+
+    async def test_health(self):
+        status, data = await self.conn.request('/health')
+        self.assertEqual((status, data['status'], data['requests']), (200, 'ok', 1))
+
+    async def test_not_found(self):
+        self.assertEqual((await self.conn.request('/nowhere'))[0], 404)
+        self.assertEqual((await self.conn.request('/metrics'))[0], 404)
+        self.assertEqual((await self.conn.request('/parse', 'DELETE'))[0], 405)
+
+    async def test_graceful_shutdown(self):
+        # A request in progress is answered; idle connections are closed; new connections are refused.
+        self.stub.latency = 0.2
+        idle = await Connection.open(self.server)
+        address = self.server.address
+        pending = asyncio.ensure_future(self.conn.request('/passage?q=john+3+16'))
+        await asyncio.sleep(0.05)
+        await self.server.stop()
+        self.assertEqual((await pending)[0], 200)
+        self.assertEqual(await idle.reader.read(), b'')
+        await idle.close()
+        host, port = address[len('http://'):].rsplit(':', 1)
+        with self.assertRaises(OSError):
+            await asyncio.open_connection(host, int(port))
+
+
+class TestServerOptions(unittest.IsolatedAsyncioTestCase):
+    async def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bibleparser.sock')
+            async with ParseServer(path=path) as server:
+                self.assertEqual(server.address, f'unix:{path}')
+                conn = await Connection.open(server)
+                self.assertEqual((await conn.request('/parse?q=jude+3'))[1]['parsed'], "Jude 1:3")
+                await conn.close()
+            self.assertFalse(os.path.exists(path))
+
+    async def test_metrics(self):
+        metrics = add_hook(MetricsAggregator())
+        try:
+            async with ParseServer(port=0, metrics=metrics) as server:
+                conn = await Connection.open(server)
+                await conn.request('/parse?q=matthew+2112')
+                status, text = await conn.request('/metrics')
+                await conn.close()
+        finally:
+            remove_hook(metrics)
+        self.assertEqual(status, 200)
+        self.assertIn('bibleparser_stage_tags_total{stage="range_check",tag="chapter_split"} 1', text)
+
+    def test_cli_arguments(self):
+        for argv, message in [(['serve', '--workers', '-1'], '--workers must be at least 0'), ([], 'the following arguments are required: command')]:
+            stderr = io.StringIO()
+            with self.assertRaises(SystemExit), contextlib.redirect_stderr(stderr):
+                main(argv)
+            self.assertIn(message, stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import sys
+sys.path.append("..")
+
+from bibleparser.bibleparser import fetch_passage, fetch_passages_async
+from bibleparser.client import PassageClient, PassageFetchError
+from bibleparser.singleflight import SingleFlight
+from bibleparser.testing import AsyncStubServer, StubServer
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_sequential_calls_are_not_coalesced(self):
+        flights = SingleFlight()
+        self.assertEqual(flights.do('a', lambda: 1), 1)
+        self.assertEqual(flights.do('a', lambda: 2), 2)
+        self.assertEqual(flights.coalesced, 0)
+
+    def test_concurrent_calls_share_result(self):
+        flights = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return object()
+
+        with ThreadPoolExecutor(8) as pool:
+            futures = [pool.submit(flights.do, 'a', slow)]
+            started.wait(5)
+            futures += [pool.submit(flights.do, 'a', slow) for _ in range(7)]
+            while flights.coalesced < 7:
+                time.sleep(0.001)
+            release.set()
+            results = [f.result() for f in futures]
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+
+
+class TestThreadedCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubServer(latency=0.2).start()
+
+    def tearDown(self):
+        self.stub.stop()
+
+    def fetch_concurrently(self, client, texts):
+        barrier = threading.Barrier(len(texts))
+        def fetch(text):
+            barrier.wait()
+            try:
+                return fetch_passage(text, client)
+            except Exception as e:
+                return e
+        with ThreadPoolExecutor(len(texts)) as pool:
+            return list(pool.map(fetch, texts))
+
+    def test_identical_requests_share_one_upstream_request(self):
+        client = PassageClient(self.stub.url)
+        self.addCleanup(client.close)
+        results = self.fetch_concurrently(client, ["John 3:16", "john three sixteen", "JOHN 3 16"] * 5)
+        self.assertEqual({r['text'] for r in results}, {"Text of John 3:16.\n"})
+        self.assertEqual(self.stub.hits, 1)
+        self.assertEqual(client.coalesced, 14)
+
+    def test_errors_are_shared(self):
+        self.stub.failures = [404]
+        client = PassageClient(self.stub.url)
+        self.addCleanup(client.close)
+        results = self.fetch_concurrently(client, ["John 3:16"] * 10)
+        self.assertTrue(all(isinstance(r, PassageFetchError) for r in results))
+        self.assertEqual(self.stub.hits, 1)
+
+    def test_different_passages_are_not_coalesced(self):
+        client = PassageClient(self.stub.url)
+        self.addCleanup(client.close)
+        self.fetch_concurrently(client, ["John 3:16", "John 3:17"] * 4)
+        self.assertEqual(self.stub.hits, 2)
+        self.assertEqual(client.coalesced, 6)
+
+    def test_disabled(self):
+        client = PassageClient(self.stub.url, coalesce=False)
+        self.addCleanup(client.close)
+        self.fetch_concurrently(client, ["John 3:16"] * 4)
+        self.assertEqual(self.stub.hits, 4)
+        self.assertEqual(client.coalesced, 0)
+
+
+class TestAsyncCoalescing(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.stub = await AsyncStubServer(latency=0.1).start()
+        self.client = PassageClient(self.stub.url)
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        await self.stub.stop()
+
+    async def test_identical_requests_share_one_upstream_request(self):
+        results = await fetch_passages_async(["John 3:16", "john three sixteen"] * 10, concurrency=20, backend=self.client)
+        self.assertEqual({r['text'] for r in results}, {"Text of John 3:16.\n"})
+        self.assertEqual(self.stub.hits, 1)
+        self.assertEqual(self.client.coalesced, 19)
+
+    async def test_errors_are_shared(self):
+        self.stub.failures = [404]
+        results = await fetch_passages_async(["John 3:16"] * 5, backend=self.client)
+        self.assertTrue(all(isinstance(r, PassageFetchError) for r in results))
+        self.assertEqual(self.stub.hits, 1)
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        first = asyncio.ensure_future(self.client.fetch_async("John 3:16"))
+        second = asyncio.ensure_future(self.client.fetch_async("John 3:16"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        self.assertEqual((await second)['reference'], "John 3:16")
+        self.assertEqual(self.stub.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+import sys
+sys.path.append("..")
+
+from bibleparser import verse_table
+from bibleparser.verse_table import BOOKS, TOTAL_VERSES, book_ordinal, max_chapter, verse_count, verse_ordinal, verse_location
+from bibleparser.book_chapter_verses import book_chapter_verses
+
+
+class TestVerseTable(unittest.TestCase):
+    def test_books(self):
+        self.assertEqual(len(BOOKS), 66)
+        self.assertEqual(book_ordinal("genesis"), 0)
+        self.assertEqual(book_ordinal("Revelation"), 65)
+        self.assertEqual(book_ordinal(7), 7)
+        with self.assertRaises(KeyError):
+            book_ordinal("hezekiah")
+        with self.assertRaises(KeyError):
+            book_ordinal(66)
+
+    def test_bounds(self):
+        self.assertEqual(max_chapter("genesis"), 50)
+        self.assertEqual(max_chapter("psalms"), 150)
+        self.assertEqual(max_chapter("jude"), 1)
+        self.assertEqual(verse_count("genesis", 1), 31)
+        self.assertEqual(verse_count("psalms", 119), 176)
+        with self.assertRaises(KeyError):
+            verse_count("jude", 2)
+        with self.assertRaises(KeyError):
+            verse_count("jude", 0)
+
+    def test_ordinals(self):
+        self.assertEqual(verse_ordinal("genesis", 1, 1), 0)
+        self.assertEqual(verse_ordinal("genesis", 2, 1), 31)
+        self.assertEqual(verse_ordinal("exodus", 1, 1), sum(book_chapter_verses["genesis"].values()))
+        self.assertEqual(verse_ordinal("revelation", 22, 21), TOTAL_VERSES - 1)
+        self.assertEqual(verse_location(0), ("genesis", 1, 1))
+        self.assertEqual(verse_location(TOTAL_VERSES - 1), ("revelation", 22, 21))
+        with self.assertRaises(KeyError):
+            verse_ordinal("john", 3, 37)
+        with self.assertRaises(KeyError):
+            verse_location(TOTAL_VERSES)
+
+    def test_ordinal_round_trip(self):
+        ordinal = 0
+        for book, chapters in book_chapter_verses.items():
+            for chapter, verses in chapters.items():
+                for verse in (1, verses):
+                    ordinal = verse_ordinal(book, chapter, verse)
+                    self.assertEqual(verse_location(ordinal), (book, chapter, verse))
+        self.assertEqual(ordinal, TOTAL_VERSES - 1)
+
+    def test_compact_storage(self):
+        self.assertEqual(verse_table._CHAPTER_VERSES.typecode, 'H')
+        self.assertEqual(len(verse_table._CHAPTER_VERSES), 1189)
+
+    def test_compatibility_view(self):
+        self.assertEqual(list(book_chapter_verses), list(BOOKS))
+        self.assertEqual(book_chapter_verses["genesis"][50], 26)
+        self.assertEqual(book_chapter_verses["revelation"][22], 21)
+        self.assertEqual(sum(len(c) for c in book_chapter_verses.values()), 1189)
+
+
+if __name__ == '__main__':
+    unittest.main()